@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+from fastapi import Depends, Header, HTTPException, status
+
+from app.core import queries
+from app.core.cache import SharedCache
+from app.core.config import settings
+from app.core.security import AuthedUser, verify_jwt
+from app.core.supabase import get_service_client
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+
+# Lets a member of several orgs act on one other than their default (oldest) membership.
+ORG_HEADER = "X-Org-Id"
+
+_admin_cache = SharedCache(
+    "authz_admin", settings.authz_cache_max_entries, settings.authz_cache_ttl_seconds, settings.cache_redis_url
+)
+_membership_cache = SharedCache(
+    "authz_memberships", settings.authz_cache_max_entries, settings.authz_cache_ttl_seconds, settings.cache_redis_url
+)
+# Bumped by invalidate_user; a load that raced with an invalidation is not cached (see _cacheable).
+_versions: dict[str, int] = {}
+
+
+def _cacheable(user_id: str, version: int) -> bool:
+    return _versions.get(user_id, 0) == version
+
+
+@dataclass(frozen=True)
+class Membership:
+    org_id: str
+    role: str
+
+
+def _memberships(rows: list[dict]) -> tuple[Membership, ...]:
+    return tuple(Membership(org_id=r["org_id"], role=r["role"]) for r in rows)
+
+
+def _resolved(value) -> asyncio.Future:
+    fut = asyncio.get_running_loop().create_future()
+    fut.set_result(value)
+    return fut
+
+
+class AuthContext:
+    """Authorization facts for the current request, each loaded at most once.
+
+    The admin flag and the membership list are fetched lazily and memoized, so a handler and
+    the helpers it calls can ask repeatedly without extra round-trips; routes that only need the
+    admin flag never pay for the membership query. Both facts are also cached across requests
+    (see invalidate_user).
+
+    `requested_org_id` is the org named by the X-Org-Id header, if any; org_id() validates it.
+    """
+
+    def __init__(self, user: AuthedUser, sb: AsyncClient, requested_org_id: Optional[str] = None):
+        self.user = user
+        self._sb = sb
+        self.requested_org_id = requested_org_id
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._version = _versions.get(user.user_id, 0)
+
+    @property
+    def user_id(self) -> str:
+        return self.user.user_id
+
+    def _once(self, name: str, load: Callable[[], Awaitable]) -> Awaitable:
+        task = self._tasks.get(name)
+        if task is None:
+            task = self._tasks[name] = asyncio.ensure_future(load())
+        return task
+
+    async def _load_admin(self) -> bool:
+        cached = await _admin_cache.get(self.user_id)
+        if cached is not None:
+            return cached
+        version = _versions.get(self.user_id, 0)
+        is_admin = await queries.is_system_admin(self._sb, self.user_id)
+        if _cacheable(self.user_id, version):
+            await _admin_cache.set(self.user_id, is_admin)
+        return is_admin
+
+    async def _load_memberships(self) -> tuple[Membership, ...]:
+        rows = await _membership_cache.get(self.user_id)
+        if rows is None:
+            version = _versions.get(self.user_id, 0)
+            rows = [{"org_id": r["org_id"], "role": r["role"]} for r in await queries.memberships(self._sb, self.user_id)]
+            if _cacheable(self.user_id, version):
+                await _membership_cache.set(self.user_id, rows)
+        return _memberships(rows)
+
+    async def _load_view(self) -> tuple[bool, tuple[Membership, ...]]:
+        is_admin, rows = await asyncio.gather(_admin_cache.get(self.user_id), _membership_cache.get(self.user_id))
+        if is_admin is None or rows is None:
+            version = _versions.get(self.user_id, 0)
+            view = await queries.me_view(self._sb, self.user_id)
+            is_admin = view["is_system_admin"]
+            rows = [{"org_id": m["org_id"], "role": m["role"]} for m in view["memberships"]]
+            if _cacheable(self.user_id, version):
+                await asyncio.gather(_admin_cache.set(self.user_id, is_admin), _membership_cache.set(self.user_id, rows))
+        mems = _memberships(rows)
+        self._tasks.setdefault("is_system_admin", _resolved(is_admin))
+        self._tasks.setdefault("memberships", _resolved(mems))
+        return is_admin, mems
+
+    async def is_system_admin(self) -> bool:
+        return await self._once("is_system_admin", self._load_admin)
+
+    async def memberships(self) -> tuple[Membership, ...]:
+        # Oldest membership first; the first one is the user's default org.
+        return await self._once("memberships", self._load_memberships)
+
+    async def load(self) -> tuple[bool, tuple[Membership, ...]]:
+        if settings.rpc_read_views and not self._tasks:
+            return await self._once("load", self._load_view)
+        return await asyncio.gather(self.is_system_admin(), self.memberships())
+
+    async def prime_memberships(self, rows: list[dict]) -> None:
+        """Record memberships that arrived with another query (e.g. an RPC read view)."""
+        rows = [{"org_id": r["org_id"], "role": r["role"]} for r in rows]
+        # The query's start time is unknown here; anything invalidated since this request began is not cached.
+        if _cacheable(self.user_id, self._version):
+            await _membership_cache.set(self.user_id, rows)
+        self._tasks.setdefault("memberships", _resolved(_memberships(rows)))
+
+    async def cached_memberships(self) -> Optional[tuple[Membership, ...]]:
+        """Memberships if already known (this request or the shared cache), without querying."""
+        task = self._tasks.get("memberships")
+        if task is not None:
+            return await task
+        rows = await _membership_cache.get(self.user_id)
+        if rows is None:
+            return None
+        mems = _memberships(rows)
+        self._tasks.setdefault("memberships", _resolved(mems))
+        return mems
+
+    async def default_org_id(self) -> Optional[str]:
+        mems = await self.memberships()
+        return mems[0].org_id if mems else None
+
+    async def role_for(self, org_id: str) -> Optional[str]:
+        # Cached memberships answer for free; otherwise one point lookup rather than loading them all.
+        mems = await self.cached_memberships()
+        if mems is None:
+            return await self._once(f"role:{org_id}", lambda: queries.member_role(self._sb, self.user_id, org_id))
+        for m in mems:
+            if m.org_id == org_id:
+                return m.role
+        return None
+
+    async def org_id(self) -> Optional[str]:
+        """The org this request acts on: the X-Org-Id org (403 unless the caller is a member), else the default org."""
+        if self.requested_org_id is None:
+            return await self.default_org_id()
+        if await self.role_for(self.requested_org_id) is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this org")
+        return self.requested_org_id
+
+
+async def cached_default_org(user_id: str) -> Optional[str]:
+    """The user's default org if their memberships are cached; never queries the database."""
+    rows = await _membership_cache.get(user_id)
+    return rows[0]["org_id"] if rows else None
+
+
+async def cached_may_act_on(user_id: str, org_id: str) -> bool:
+    """True if the cached admin flag or memberships show the user may act on `org_id`; never queries."""
+    is_admin, rows = await asyncio.gather(_admin_cache.get(user_id), _membership_cache.get(user_id))
+    return bool(is_admin) or any(r["org_id"] == org_id for r in rows or ())
+
+
+async def invalidate_user(user_id: str) -> None:
+    """Drop cached authorization facts for a user after their memberships change."""
+    _versions[user_id] = _versions.get(user_id, 0) + 1
+    await asyncio.gather(_admin_cache.delete(user_id), _membership_cache.delete(user_id))
+
+
+def _requested_org(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {ORG_HEADER} header") from None
+
+
+async def get_auth_context(
+    user: AuthedUser = Depends(verify_jwt),
+    x_org_id: Optional[str] = Header(default=None, include_in_schema=False),
+) -> AuthContext:
+    # FastAPI's dependency cache hands this same instance to the handler and to every
+    # dependency that asks for it within one request.
+    requested = _requested_org(x_org_id)
+    try:
+        sb = await get_service_client()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
+    return AuthContext(user, sb, requested)
+
+
+async def require_system_admin(ctx: AuthContext = Depends(get_auth_context)) -> AuthContext:
+    if not await ctx.is_system_admin():
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="System admin required")
+    return ctx
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache with a per-entry expiry. Thread-safe."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+
+class SingleFlight:
+    """Collapse concurrent awaits for the same key into one execution of fn."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _t: self._calls.pop(key, None))
+        # shield: a cancelled waiter must not cancel the shared call for everyone else.
+        return await asyncio.shield(task)
+
+
+class _MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._cache)
+
+
+class _RedisBackend:
+    # Values are stored as JSON, so only plain data (dicts, lists, str, bool, numbers) round-trips.
+    def __init__(self, url: str, namespace: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_REDIS_URL is set but the 'redis' package is not installed") from e
+        self._redis = redis.from_url(url)
+        self._ns = namespace
+
+    async def get(self, key: str) -> Any:
+        raw = await self._redis.get(f"{self._ns}:{key}")
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._redis.set(f"{self._ns}:{key}", json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(f"{self._ns}:{key}")
+
+    async def clear(self) -> None:
+        async for key in self._redis.scan_iter(match=f"{self._ns}:*"):
+            await self._redis.delete(key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class SharedCache:
+    """Async TTL cache: in-process by default, Redis-backed (shared by all workers) when
+    CACHE_REDIS_URL is set. Backend errors count as misses so callers fall through to the DB.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, redis_url: str = ""):
+        self.name = name
+        self.ttl = ttl
+        self._backend = _RedisBackend(redis_url, name) if redis_url else _MemoryBackend(maxsize, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        _registry[name] = self
+
+    async def get(self, key: str) -> Any:
+        try:
+            value = await self._backend.get(key)
+        except Exception:
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            await self._backend.set(key, value, self.ttl if ttl is None else min(ttl, self.ttl))
+        except Exception:
+            self.errors += 1
+
+    async def delete(self, key: str) -> None:
+        # Invalidation failures are not swallowed: a stale role must not outlive a mutation silently.
+        await self._backend.delete(key)
+
+    async def clear(self) -> None:
+        await self._backend.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis" if isinstance(self._backend, _RedisBackend) else "memory",
+            "size": self._backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+
+_registry: dict[str, Any] = {}
+
+
+def register(name: str, cache: Any) -> None:
+    _registry[name] = cache
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+async def clear_caches() -> None:
+    """Empty every registered cache (benchmarks' cold-cache pass)."""
+    for cache in _registry.values():
+        if isinstance(cache, SharedCache):
+            await cache.clear()
+        else:
+            cache.clear()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +11,91 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_service_role_key: str = ""
     supabase_jwt_secret: str = ""
+    supabase_jwt_audience: str = "authenticated"
+
+    # Verified-token cache: entries expire at the token's exp, capped by the TTL below.
+    auth_cache_max_entries: int = 10000
+    auth_cache_ttl_seconds: float = 300.0
+    # Asymmetric (JWKS) signing keys: background refresh interval, and the minimum gap between
+    # inline refetches triggered by an unknown kid.
+    supabase_jwks_refresh_seconds: float = 600.0
+    supabase_jwks_min_refresh_seconds: float = 30.0
+
+    # Cross-request cache of "is system admin" and "memberships by user". Admin member mutations
+    # invalidate entries immediately; the TTL bounds staleness for changes made outside the API.
+    authz_cache_ttl_seconds: float = 60.0
+    authz_cache_max_entries: int = 10000
+    # Module catalog refresh interval and per-org module flag snapshot cache.
+    module_catalog_refresh_seconds: float = 300.0
+    module_flags_ttl_seconds: float = 30.0
+    module_flags_max_orgs: int = 10000
+    # Write module flags through the set_org_modules SQL function (migration 0004): one round-trip
+    # that applies the updates and returns the merged catalog + flags.
+    module_flags_use_rpc: bool = False
+    # Serve cold /me and /org/modules through the get_me / get_org_modules_for_user SQL functions
+    # (migration 0005): one round-trip each instead of two and three.
+    rpc_read_views: bool = False
+
+    # Bulk member import: rows per upsert, email lookups in flight, hard row cap per request.
+    bulk_import_chunk_size: int = 500
+    bulk_import_max_rows: int = 50000
+    user_lookup_concurrency: int = 16
+    # Rows per PostgREST request when streaming exports (PostgREST's default max-rows is 1000).
+    export_page_size: int = 1000
+    # Email -> user id resolution: "auth_api" (GoTrue admin API) or "table" (public.auth_user_lookup,
+    # see migration 0003). Hits are cached for the TTL; unknown emails for the shorter negative TTL.
+    user_lookup_source: str = "auth_api"
+    user_lookup_cache_ttl_seconds: float = 300.0
+    user_lookup_negative_ttl_seconds: float = 30.0
+    user_lookup_cache_max_entries: int = 10000
+    # GoTrue versions that ignore the admin API's email filter list every user; pages scanned before giving up.
+    user_lookup_max_pages: int = 20
+
+    # List endpoint serialization: "off" (FastAPI response_model), "validated" (one TypeAdapter pass)
+    # or "trusted" (no revalidation of DB rows; orjson if installed). See app/core/responses.py.
+    fast_responses: Literal["off", "validated", "trusted"] = "off"
+
+    # Background jobs (app/core/jobs.py): workers per process, attempts and backoff base for
+    # transient Supabase failures, how often each process polls for queued jobs and stale leases,
+    # and how long a running job may go without a heartbeat before another worker takes it over.
+    job_workers: int = 2
+    job_max_attempts: int = 5
+    job_retry_base_seconds: float = 1.0
+    job_poll_seconds: float = 5.0
+    job_lease_seconds: float = 60.0
+
+    # Upstream calls (app/core/upstream.py): total deadline per call including retries, retries of
+    # idempotent reads, coalescing of identical in-flight GETs, and the per-service circuit breaker
+    # (consecutive failures to open it, seconds it stays open before a probe).
+    upstream_deadline_seconds: float = 8.0
+    upstream_read_retries: int = 2
+    upstream_retry_base_seconds: float = 0.1
+    upstream_coalesce_gets: bool = True
+    circuit_failure_threshold: int = 5
+    circuit_open_seconds: float = 10.0
+
+    # Admission control (app/core/rate_limit.py): token buckets per user and per org (tokens/s and
+    # burst; exports and bulk writes cost more than one token) and concurrent requests per tenant.
+    # Shared across workers through CACHE_REDIS_URL when set.
+    rate_limit_enabled: bool = False
+    rate_limit_user_per_second: float = 20.0
+    rate_limit_user_burst: float = 40.0
+    rate_limit_org_per_second: float = 50.0
+    rate_limit_org_burst: float = 100.0
+    rate_limit_tenant_concurrency: int = 16
+
+    # Log requests slower than this (ms) with their upstream call breakdown; 0 disables.
+    slow_request_ms: float = 0.0
+
+    # Optional shared cache backend for multi-worker deployments (e.g. redis://localhost:6379/0).
+    cache_redis_url: str = ""
+
+    # Shared upstream connection pool (PostgREST + Auth API), created once per process.
+    supabase_pool_max_connections: int = 20
+    supabase_pool_max_keepalive: int = 10
+    supabase_pool_keepalive_expiry: float = 30.0
+    supabase_connect_timeout: float = 5.0
+    supabase_read_timeout: float = 10.0
 
     cors_origins: str = "http://localhost:3000"
     port: int = 8000
@@ -0,0 +1,67 @@
+import asyncio
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Awaitable, Callable, Literal, Optional
+
+from fastapi.responses import StreamingResponse
+
+ExportFormat = Literal["ndjson", "csv"]
+Page = tuple[list[dict], Optional[str]]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def _pages(fetch: Callable[[Optional[str]], Awaitable[Page]]) -> AsyncIterator[list[dict]]:
+    # The next page is requested while the current one is encoded and sent.
+    task = asyncio.ensure_future(fetch(None))
+    try:
+        while True:
+            rows, cursor = await task
+            if cursor:
+                task = asyncio.ensure_future(fetch(cursor))
+            yield rows
+            if not cursor:
+                return
+    finally:
+        task.cancel()
+
+
+async def _encode(pages: AsyncIterator[list[dict]], columns: list[str], fmt: ExportFormat) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(columns)
+        async for rows in pages:
+            writer.writerows([r.get(c) for c in columns] for r in rows)
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+        return
+    async for rows in pages:
+        yield "".join(json.dumps({c: r.get(c) for c in columns}) + "\n" for r in rows).encode()
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def export_response(
+    fetch: Callable[[Optional[str]], Awaitable[Page]], columns: str, fmt: ExportFormat, name: str, gzip: bool
+) -> StreamingResponse:
+    """Stream every row reachable through a keyset-paginated `fetch(cursor)`, one page in memory at a time.
+
+    With gzip the body is a .gz file (not Content-Encoding), so it downloads compressed.
+    """
+    body = _encode(_pages(fetch), columns.split(","), fmt)
+    filename = f"{name}.{fmt}"
+    media_type = MEDIA_TYPES[fmt]
+    if gzip:
+        body, filename, media_type = _gzip(body), f"{filename}.gz", "application/gzip"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
@@ -0,0 +1,36 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Per-user payloads: browsers may keep them, shared caches may not. "no-cache" still stores the
+# response but revalidates every time, which is where If-None-Match / 304 pays off.
+REVALIDATE = "private, no-cache"
+
+
+def short_lived(seconds: int) -> str:
+    return f"private, max-age={seconds}, must-revalidate"
+
+
+def etag_for(*parts: Any) -> str:
+    """Weak ETag over the facts a payload is built from (cheap to compute from cached state)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): ignore the W/ prefix on either side.
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in if_none_match.split(","))
+
+
+def conditional(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """Set ETag / Cache-Control on `response`; return a 304 to send instead if the client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization, X-Org-Id"}
+    inm = request.headers.get("if-none-match")
+    if inm and _matches(inm, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,59 @@
+from typing import Optional
+
+from app.core import queries
+from app.core.jobs import JobContext, handler
+from app.core.member_import import iterate_records, new_counts, run_import
+from app.core.module_flags import module_flags
+
+ROLLOUT_ORGS_PER_CALL = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+@handler("seed_org")
+async def seed_org(job: JobContext, payload: dict) -> dict:
+    # Defense-in-depth: the organizations_seed_core trigger seeds core too.
+    await job.sb.table("org_modules").upsert(
+        {"org_id": payload["org_id"], "module_key": "core", "is_enabled": True},
+        on_conflict="org_id,module_key",
+    ).execute()
+    module_flags.invalidate(payload["org_id"])
+    return {"org_id": payload["org_id"]}
+
+
+@handler("module_rollout")
+async def module_rollout(job: JobContext, payload: dict) -> dict:
+    """Apply `updates` to `org_ids`, or to every org when org_ids is null, 1000 orgs per upsert."""
+    updates: dict[str, bool] = payload["updates"]
+    org_ids: Optional[list[str]] = payload.get("org_ids")
+    done = 0
+
+    if org_ids is not None:
+        await job.progress(0, len(org_ids))
+        for i in range(0, len(org_ids), ROLLOUT_ORGS_PER_CALL):
+            chunk = org_ids[i : i + ROLLOUT_ORGS_PER_CALL]
+            await module_flags.set_flags(job.sb, chunk, updates)
+            done += len(chunk)
+            await job.progress(done)
+        return {"orgs": done}
+
+    cursor = None
+    while True:
+        rows, cursor = await queries.org_page(job.sb, status=None, name_prefix=None, limit=ROLLOUT_ORGS_PER_CALL, cursor=cursor)
+        if rows:
+            await module_flags.set_flags(job.sb, [r["id"] for r in rows], updates)
+            done += len(rows)
+            await job.progress(done)
+        if not cursor:
+            return {"orgs": done}
+
+
+@handler("member_import")
+async def member_import(job: JobContext, payload: dict) -> dict:
+    rows = payload["rows"]
+    counts = new_counts()
+    errors: list[dict] = []
+    await job.progress(0, len(rows))
+    async for results in run_import(job.sb, payload["org_id"], iterate_records(rows), counts):
+        errors.extend(r for r in results if r["status"] == "error")
+        await job.progress(counts["total"])
+    return {"summary": counts, "errors": errors[:MAX_REPORTED_ERRORS]}
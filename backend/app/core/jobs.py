@@ -0,0 +1,257 @@
+"""In-process background jobs backed by the public.jobs table (migration 0006).
+
+Endpoints enqueue a job (one insert) and return its row; a small pool of asyncio workers started in
+the FastAPI lifespan claims queued jobs, runs the registered handler and records progress, result
+or error on the row, so GET /admin/jobs/{id} works from any worker. Handlers must be idempotent:
+transient Supabase failures re-run them with exponential backoff up to JOB_MAX_ATTEMPTS.
+
+A running job holds a lease: its worker bumps heartbeat_at (migration 0009) every
+JOB_LEASE_SECONDS / 3. Every process with workers polls every JOB_POLL_SECONDS. It picks up queued
+jobs, including ones enqueued by processes without workers, and requeues jobs whose lease expired
+because their process died. Each lost run counts as an attempt.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
+
+import httpx
+from postgrest.exceptions import APIError
+
+from app.core.config import settings
+from app.core.supabase import get_service_client
+from app.core.upstream import full_jitter
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+logger = logging.getLogger("app.jobs")
+
+JOB_COLUMNS = "id,kind,status,progress,total,attempts,result,error,created_at,started_at,finished_at"
+
+# Postgres SQLSTATE classes/codes worth retrying (connection, serialization, deadlock, resources,
+# statement timeout) and PostgREST's own connection errors.
+_TRANSIENT_SQLSTATES = ("08", "40001", "40P01", "53", "57014", "PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, APIError):
+        code = str(exc.code or "")
+        # Non-JSON error bodies (gateway errors) carry the HTTP status as the code.
+        return code in ("502", "503", "504") or code.startswith(_TRANSIENT_SQLSTATES)
+    return False
+
+
+def backoff(attempt: int) -> float:
+    return full_jitter(attempt, settings.job_retry_base_seconds)
+
+
+async def retrying(fn: Callable[[], Awaitable[Any]], attempts: Optional[int] = None) -> Any:
+    attempts = attempts or settings.job_max_attempts
+    for attempt in range(1, attempts + 1):
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt == attempts or not is_transient(e):
+                raise
+            await asyncio.sleep(backoff(attempt))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobContext:
+    """Handed to handlers for progress reporting."""
+
+    def __init__(self, sb: AsyncClient, job_id: str):
+        self.sb = sb
+        self.job_id = job_id
+
+    async def progress(self, done: int, total: Optional[int] = None) -> None:
+        patch: dict[str, Any] = {"progress": done}
+        if total is not None:
+            patch["total"] = total
+        await retrying(lambda: self.sb.table("jobs").update(patch).eq("id", self.job_id).execute())
+
+
+Handler = Callable[[JobContext, dict], Awaitable[Optional[dict]]]
+HANDLERS: dict[str, Handler] = {}
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(fn: Handler) -> Handler:
+        HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+class JobRunner:
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        # Job ids queued in this process and not yet run, so polling doesn't queue them twice.
+        self._pending: set[str] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        if self.running or settings.job_workers <= 0:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(settings.job_workers)]
+        # The first poll picks up jobs left queued (or running) by a previous process.
+        self._workers.append(asyncio.create_task(self._poll()))
+
+    async def stop(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._pending.clear()
+
+    def _submit(self, job_id: str) -> None:
+        if self._queue is not None and job_id not in self._pending:
+            self._pending.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                sb = await get_service_client()
+                await self._reclaim(sb)
+                # Only top up when the local workers are close to idle; other processes share the rest.
+                if self._queue.qsize() < settings.job_workers:
+                    res = await (
+                        sb.table("jobs")
+                        .select("id")
+                        .eq("status", "queued")
+                        .order("created_at", desc=False)
+                        .limit(settings.job_workers * 4)
+                        .execute()
+                    )
+                    for row in res.data or []:
+                        self._submit(row["id"])
+            except Exception:
+                logger.exception("job poll failed")
+            await asyncio.sleep(settings.job_poll_seconds)
+
+    async def _reclaim(self, sb: AsyncClient) -> None:
+        """Requeue (or fail, once out of attempts) running jobs whose lease has expired."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=settings.job_lease_seconds)).isoformat()
+        res = await sb.table("jobs").select("id,attempts,heartbeat_at").eq("status", "running").lt("heartbeat_at", cutoff).limit(100).execute()
+        for row in res.data or []:
+            attempts = (row["attempts"] or 0) + 1
+            error = f"Worker lost: no heartbeat for {settings.job_lease_seconds:g}s"
+            if attempts < settings.job_max_attempts:
+                patch = {"status": "queued", "attempts": attempts, "error": error}
+            else:
+                patch = {"status": "failed", "attempts": attempts, "error": error, "finished_at": _now()}
+            # Conditional on the heartbeat we saw: a worker that is merely slow and heartbeats again keeps its job.
+            done = await (
+                sb.table("jobs")
+                .update(patch)
+                .eq("id", row["id"])
+                .eq("status", "running")
+                .eq("heartbeat_at", row["heartbeat_at"])
+                .execute()
+            )
+            if done.data:
+                logger.warning("job %s lease expired; %s", row["id"], patch["status"])
+                if patch["status"] == "queued":
+                    self._submit(row["id"])
+
+    async def _heartbeat(self, sb: AsyncClient, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(settings.job_lease_seconds / 3)
+            try:
+                res = await sb.table("jobs").update({"heartbeat_at": _now()}).eq("id", job_id).eq("status", "running").execute()
+                if not res.data:
+                    logger.warning("job %s lost its lease", job_id)
+            except Exception as e:
+                logger.warning("job %s heartbeat failed: %s", job_id, e)
+
+    async def enqueue(self, kind: str, payload: dict, created_by: Optional[str] = None) -> dict:
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        sb = await get_service_client()
+        res = await sb.table("jobs").insert({"kind": kind, "payload": payload, "created_by": created_by}).execute()
+        job = res.data[0]
+        # Without local workers (or before they start) the job waits for a poll, here or elsewhere.
+        self._submit(job["id"])
+        return {k: job.get(k) for k in JOB_COLUMNS.split(",")}
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._pending.discard(job_id)
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _finish(self, sb: AsyncClient, job_id: str, patch: dict) -> None:
+        await retrying(lambda: sb.table("jobs").update({**patch, "finished_at": _now()}).eq("id", job_id).execute())
+
+    async def _run(self, job_id: str) -> None:
+        sb = await get_service_client()
+        # Claim: only one worker (in any process) moves a job out of "queued".
+        now = _now()
+        claimed = await retrying(
+            lambda: sb.table("jobs")
+            .update({"status": "running", "started_at": now, "heartbeat_at": now})
+            .eq("id", job_id)
+            .eq("status", "queued")
+            .execute()
+        )
+        if not claimed.data:
+            return
+        job = claimed.data[0]
+        run = HANDLERS.get(job["kind"])
+        if run is None:
+            await self._finish(sb, job_id, {"status": "failed", "error": f"Unknown job kind: {job['kind']}"})
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(sb, job_id))
+        try:
+            await self._execute(sb, job_id, job, run)
+        finally:
+            heartbeat.cancel()
+
+    async def _execute(self, sb: AsyncClient, job_id: str, job: dict, run: Handler) -> None:
+        attempt = job.get("attempts") or 0
+        while True:
+            attempt += 1
+            try:
+                result = await run(JobContext(sb, job_id), job["payload"] or {})
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if is_transient(e) and attempt < settings.job_max_attempts:
+                    logger.warning("job %s attempt %d failed, retrying: %s", job_id, attempt, error)
+                    await retrying(lambda: sb.table("jobs").update({"attempts": attempt, "error": error}).eq("id", job_id).execute())
+                    await asyncio.sleep(backoff(attempt))
+                    continue
+                logger.exception("job %s failed", job_id)
+                await self._finish(sb, job_id, {"status": "failed", "attempts": attempt, "error": error})
+                return
+            await self._finish(sb, job_id, {"status": "succeeded", "attempts": attempt, "error": None, "result": result})
+            return
+
+
+runner = JobRunner()
+
+
+async def get_job(sb: AsyncClient, job_id: str) -> Optional[dict]:
+    res = await sb.table("jobs").select(JOB_COLUMNS).eq("id", job_id).execute()
+    return res.data[0] if res.data else None
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import uuid
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+
+from app.core.authz import invalidate_user
+from app.core.config import settings
+from app.core.users import resolve_emails
+from app.schemas import MemberAddRequest
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+CSV_TYPES = ("text/csv", "application/csv")
+
+
+def _lines(body: bytes) -> Iterator[str]:
+    return (line.rstrip("\r") for line in body.decode("utf-8-sig").split("\n") if line.strip())
+
+
+async def _ndjson(body: bytes) -> AsyncIterator[Any]:
+    for line in _lines(body):
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+async def _csv(body: bytes) -> AsyncIterator[Any]:
+    rows = csv.reader(_lines(body))
+    header = [h.strip().lower() for h in next(rows, [])]
+    for values in rows:
+        yield {k: (v.strip() or None) for k, v in zip(header, values)}
+
+
+async def iterate_records(items: list) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def open_records(request: Request) -> AsyncIterator[Any]:
+    """Read and validate the upload before the response starts, so bad input is a proper 4xx rather
+    than a broken stream. The body is read here because a streaming response cannot also consume the
+    request stream; NDJSON and CSV rows are still parsed lazily, one chunk at a time.
+    """
+    ctype = (request.headers.get("content-type") or "application/json").split(";")[0].strip().lower()
+    if ctype not in NDJSON_TYPES + CSV_TYPES + ("application/json",):
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Unsupported content type: {ctype}")
+    raw = await request.body()
+    if ctype in NDJSON_TYPES:
+        return _ndjson(raw)
+    if ctype in CSV_TYPES:
+        return _csv(raw)
+    try:
+        body = json.loads(raw)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body") from e
+    if not isinstance(body, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of members")
+    return iterate_records(body)
+
+
+async def _chunks(records: AsyncIterator[Any], size: int) -> AsyncIterator[list[tuple[int, Any]]]:
+    chunk: list[tuple[int, Any]] = []
+    n = 0
+    async for rec in records:
+        n += 1
+        chunk.append((n, rec))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _import_chunk(sb: AsyncClient, org_id: str, chunk: list[tuple[int, Any]]) -> list[dict]:
+    results: dict[int, dict] = {}
+    parsed: list[tuple[int, MemberAddRequest]] = []
+    for n, rec in chunk:
+        try:
+            item = MemberAddRequest.model_validate(rec)
+        except ValidationError as e:
+            results[n] = {"row": n, "status": "error", "error": e.errors(include_url=False)[0]["msg"]}
+            continue
+        if not item.user_id and not item.email:
+            results[n] = {"row": n, "status": "error", "error": "Provide user_id or existing user email"}
+            continue
+        if item.user_id:
+            # Checked here: one malformed uuid would make Postgres reject the whole chunk's upsert.
+            try:
+                item.user_id = str(uuid.UUID(item.user_id))
+            except ValueError:
+                results[n] = {"row": n, "user_id": item.user_id, "status": "error", "error": "user_id is not a UUID"}
+                continue
+        parsed.append((n, item))
+
+    resolved = await resolve_emails(item.email for _, item in parsed if not item.user_id)
+
+    # One row per user: Postgres rejects an upsert that touches the same row twice.
+    by_user: dict[str, tuple[int, MemberAddRequest]] = {}
+    emails = {n: item.email for n, item in parsed}
+    for n, item in parsed:
+        uid = item.user_id or resolved.get(item.email.strip().lower())
+        if not uid:
+            results[n] = {"row": n, "email": item.email, "status": "error", "error": "Unknown email"}
+            continue
+        if uid in by_user:
+            prev = by_user[uid][0]
+            results[prev] = {"row": prev, "email": emails[prev], "user_id": uid, "status": "skipped", "error": f"Superseded by row {n}"}
+        by_user[uid] = (n, item)
+
+    if by_user:
+        rows = [{"org_id": org_id, "user_id": uid, "role": item.role} for uid, (_, item) in by_user.items()]
+        saved: dict[str, dict] = {}
+        errors: dict[str, str] = {}
+        await _upsert(sb, rows, saved, errors)
+        for uid, (n, item) in by_user.items():
+            member = saved.get(uid)
+            if member:
+                results[n] = {"row": n, "email": item.email, "user_id": uid, "status": "ok", "member_id": member["id"], "role": member["role"]}
+            else:
+                results[n] = {"row": n, "email": item.email, "user_id": uid, "status": "error", "error": errors.get(uid, "Not saved")}
+        await asyncio.gather(*(invalidate_user(uid) for uid in saved))
+
+    return [results[n] for n, _ in chunk]
+
+
+async def _upsert(sb: AsyncClient, rows: list[dict], saved: dict[str, dict], errors: dict[str, str]) -> None:
+    """Upsert `rows` in one call; if Postgres rejects it, retry each half so the error lands on the
+    offending rows only (a single bad row costs about 2 * log2(chunk size) extra calls)."""
+    try:
+        res = await sb.table("org_members").upsert(rows, on_conflict="org_id,user_id").execute()
+    except Exception as e:
+        if len(rows) == 1:
+            errors[rows[0]["user_id"]] = getattr(e, "message", None) or str(e) or "Upsert failed"
+            return
+        mid = len(rows) // 2
+        await _upsert(sb, rows[:mid], saved, errors)
+        await _upsert(sb, rows[mid:], saved, errors)
+        return
+    saved.update((r["user_id"], r) for r in res.data or [])
+
+
+def new_counts() -> dict[str, Any]:
+    return {"total": 0, "ok": 0, "skipped": 0, "error": 0, "truncated": False}
+
+
+async def run_import(sb: AsyncClient, org_id: str, records: AsyncIterator[Any], counts: dict[str, Any]) -> AsyncIterator[list[dict]]:
+    """Import in chunks, yielding each chunk's per-row results and tallying them into `counts`.
+
+    Rows past BULK_IMPORT_MAX_ROWS are not read; counts["truncated"] is set instead.
+    """
+    async for chunk in _chunks(records, settings.bulk_import_chunk_size):
+        if chunk[-1][0] > settings.bulk_import_max_rows:
+            chunk = [c for c in chunk if c[0] <= settings.bulk_import_max_rows]
+            counts["truncated"] = True
+        results = await _import_chunk(sb, org_id, chunk)
+        for result in results:
+            counts["total"] += 1
+            counts[result["status"]] += 1
+        yield results
+        if counts["truncated"]:
+            break
+
+
+async def import_members(sb: AsyncClient, org_id: str, records: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """Run a bulk import, yielding one NDJSON result line per input row and a final summary."""
+    counts = new_counts()
+    async for results in run_import(sb, org_id, records, counts):
+        yield "".join(json.dumps(r) + "\n" for r in results).encode()
+    yield (json.dumps({"summary": counts}) + "\n").encode()
@@ -0,0 +1,254 @@
+"""Request and upstream-call metrics, exposed in Prometheus text format on GET /metrics.
+
+MetricsMiddleware opens a per-request RequestStats in a context variable. Every upstream HTTP call
+(PostgREST and the Auth API) goes through TimedTransport, which records into it, and verify_jwt
+records the time spent authenticating. At the end of the request the totals land in the
+histograms below and, past SLOW_REQUEST_MS, in a slow-request log line with the call breakdown.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import httpx
+
+from app.core.cache import cache_stats
+from app.core.config import settings
+
+logger = logging.getLogger("app.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values. Thread-safe."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple[str, ...], value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v[0]), v[1]) for k, v in self._series.items()]
+        for label_values, counts, total in sorted(items):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if base else ""
+            running = 0
+            for bound, n in zip(self.buckets, counts):
+                running += n
+                out.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {running}')
+            running += counts[-1]
+            out.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {running}')
+            out.append(f"{self.name}_sum{{{base}}} {total}")
+            out.append(f"{self.name}_count{{{base}}} {running}")
+        return out
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values. Thread-safe."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, value in items:
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            out.append(f"{self.name}{{{base}}} {value}")
+        return out
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"), LATENCY_BUCKETS
+)
+REQUEST_UPSTREAM_CALLS = Histogram(
+    "http_request_upstream_calls", "Upstream calls made per request.", ("route",), COUNT_BUCKETS
+)
+REQUEST_PHASE_SECONDS = Histogram(
+    "http_request_phase_seconds",
+    "Per-request time spent in auth verification and in database calls (concurrent calls are summed).",
+    ("route", "phase"),
+    LATENCY_BUCKETS,
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_call_duration_seconds", "Upstream call latency by service and target.", ("service", "target"), LATENCY_BUCKETS
+)
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_UPSTREAM_CALLS, REQUEST_PHASE_SECONDS, UPSTREAM_SECONDS)
+
+REQUESTS_THROTTLED = Counter(
+    "http_requests_throttled_total", "Requests rejected with 429 by admission control.", ("route", "reason")
+)
+COUNTERS = (REQUESTS_THROTTLED,)
+
+
+@dataclass
+class UpstreamCall:
+    service: str
+    method: str
+    target: str
+    seconds: float
+    status: Optional[int]
+
+
+@dataclass
+class RequestStats:
+    calls: list[UpstreamCall] = field(default_factory=list)
+    auth_seconds: float = 0.0
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(c.seconds for c in self.calls if c.service == "db")
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def auth_timer() -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.auth_seconds += time.perf_counter() - start
+
+
+def classify(url: httpx.URL) -> tuple[str, str]:
+    parts = url.path.strip("/").split("/")
+    if parts[:2] == ["rest", "v1"] and len(parts) > 2:
+        return "db", "/".join(parts[2:4]) if parts[2] == "rpc" else parts[2]
+    if parts[:2] == ["auth", "v1"]:
+        return "auth", "/".join(p for p in parts[2:4] if p)
+    return "other", url.host
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """Wraps the pooled transport; times each call up to the response headers."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        service, target = classify(request.url)
+        start = time.perf_counter()
+        status = None
+        try:
+            response = await self._inner.handle_async_request(request)
+            status = response.status_code
+            return response
+        finally:
+            seconds = time.perf_counter() - start
+            UPSTREAM_SECONDS.observe((service, target), seconds)
+            stats = _current.get()
+            if stats is not None:
+                stats.calls.append(UpstreamCall(service, request.method, target, seconds, status))
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def _route_template(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _log_slow(method: str, route: str, path: str, status: int, seconds: float, stats: RequestStats) -> None:
+    breakdown = ", ".join(
+        f"{c.service}:{c.method} {c.target} {c.status or 'error'} {c.seconds * 1000:.1f}ms" for c in stats.calls
+    )
+    logger.warning(
+        "slow request %s %s (%s) %s %.1fms auth=%.1fms db=%.1fms calls=%d [%s]",
+        method,
+        path,
+        route,
+        status,
+        seconds * 1000,
+        stats.auth_seconds * 1000,
+        stats.db_seconds * 1000,
+        len(stats.calls),
+        breakdown,
+    )
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are timed to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - start
+            _current.reset(token)
+            route = _route_template(scope)
+            REQUEST_SECONDS.observe((scope["method"], route, str(status)), seconds)
+            REQUEST_UPSTREAM_CALLS.observe((route,), len(stats.calls))
+            REQUEST_PHASE_SECONDS.observe((route, "auth"), stats.auth_seconds)
+            REQUEST_PHASE_SECONDS.observe((route, "db"), stats.db_seconds)
+            if settings.slow_request_ms and seconds * 1000 >= settings.slow_request_ms:
+                _log_slow(scope["method"], route, scope["path"], status, seconds, stats)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for h in HISTOGRAMS:
+        lines.extend(h.render())
+    for c in COUNTERS:
+        lines.extend(c.render())
+    caches = cache_stats()
+    for kind in ("hits", "misses"):
+        name = f"cache_{kind}_total"
+        lines += [f"# HELP {name} Cache {kind} since process start.", f"# TYPE {name} counter"]
+        lines += [f'{name}{{cache="{c}"}} {s.get(kind, 0)}' for c, s in sorted(caches.items())]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import Depends, HTTPException, status
+
+from app.core import queries
+from app.core.authz import AuthContext, get_auth_context
+from app.core.cache import SingleFlight, TTLCache, register
+from app.core.config import settings
+from app.core.supabase import get_service_client
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+LOCKED_ON = frozenset({"core"})
+
+
+@dataclass(frozen=True)
+class OrgModules:
+    """Immutable snapshot of one org's enabled modules."""
+
+    org_id: str
+    version: int
+    enabled: frozenset[str]
+
+    def is_enabled(self, key: str) -> bool:
+        return key in self.enabled
+
+
+class ModuleFlagService:
+    """Module catalog plus per-org flag snapshots, shared by every route that needs them.
+
+    The catalog is loaded once and refreshed in the background every
+    MODULE_CATALOG_REFRESH_SECONDS. Org snapshots are cached for MODULE_FLAGS_TTL_SECONDS and
+    dropped by invalidate(); each invalidation bumps the org's version so a load that raced with
+    a write is never cached.
+    """
+
+    def __init__(self):
+        self._catalog: tuple[dict, ...] = ()
+        self._catalog_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._snapshots = TTLCache(maxsize=settings.module_flags_max_orgs, ttl=settings.module_flags_ttl_seconds)
+        self._versions: dict[str, int] = {}
+        self._inflight = SingleFlight()
+        register("module_flags", self._snapshots)
+
+    async def _load_catalog(self, sb: AsyncClient) -> None:
+        self._catalog = tuple({"key": m["key"], "name": m["name"]} for m in await queries.module_catalog(sb))
+        self._catalog_at = time.monotonic()
+
+    async def _refresh_quietly(self, sb: AsyncClient) -> None:
+        try:
+            await self._load_catalog(sb)
+        except Exception:
+            pass
+
+    async def catalog(self, sb: AsyncClient) -> tuple[dict, ...]:
+        if not self._catalog_at:
+            await self._inflight.do("catalog", lambda: self._load_catalog(sb))
+        elif time.monotonic() - self._catalog_at > settings.module_catalog_refresh_seconds:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh_quietly(sb))
+        return self._catalog
+
+    async def _load_org(self, sb: AsyncClient, org_id: str) -> OrgModules:
+        version = self._versions.get(org_id, 0)
+        flags = await queries.org_module_flags(sb, org_id)
+        snap = OrgModules(
+            org_id=org_id,
+            version=version,
+            enabled=LOCKED_ON | {f["module_key"] for f in flags if f["is_enabled"]},
+        )
+        if self._versions.get(org_id, 0) == version:
+            self._snapshots.set(org_id, snap)
+        return snap
+
+    async def for_org(self, sb: AsyncClient, org_id: str) -> OrgModules:
+        snap = self._snapshots.get(org_id)
+        if snap is not None and snap.version == self._versions.get(org_id, 0):
+            return snap
+        return await self._inflight.do(("org", org_id, self._versions.get(org_id, 0)), lambda: self._load_org(sb, org_id))
+
+    async def flags(self, sb: AsyncClient, org_id: str) -> list[dict]:
+        catalog, snap = await asyncio.gather(self.catalog(sb), self.for_org(sb, org_id))
+        return [{"key": m["key"], "name": m["name"], "is_enabled": snap.is_enabled(m["key"])} for m in catalog]
+
+    def _has_current(self, org_id: str) -> bool:
+        snap = self._snapshots.get(org_id)
+        return snap is not None and snap.version == self._versions.get(org_id, 0)
+
+    async def flags_for_user(self, sb: AsyncClient, ctx: AuthContext) -> list[dict]:
+        """Flags for the request's org (X-Org-Id or the default org; [] without a membership).
+
+        With RPC_READ_VIEWS and no X-Org-Id, anything not already cached (memberships, catalog or the org snapshot)
+        is fetched in one get_org_modules_for_user call, which also warms those caches.
+        """
+        if not settings.rpc_read_views or ctx.requested_org_id:
+            org_id = await ctx.org_id()
+            return await self.flags(sb, org_id) if org_id else []
+
+        mems = await ctx.cached_memberships()
+        if mems is not None:
+            if not mems:
+                return []
+            if self._catalog_at and self._has_current(mems[0].org_id):
+                return await self.flags(sb, mems[0].org_id)
+
+        view = await queries.org_modules_view(sb, ctx.user_id)
+        await ctx.prime_memberships(view["memberships"])
+        if not view["org_id"]:
+            return []
+        if not self._catalog_at:
+            self._catalog = tuple({"key": m["key"], "name": m["name"]} for m in view["modules"])
+            self._catalog_at = time.monotonic()
+        self.replace(view["org_id"], {m["key"] for m in view["modules"] if m["is_enabled"]})
+        return [{"key": m["key"], "name": m["name"], "is_enabled": m["is_enabled"]} for m in view["modules"]]
+
+    def invalidate(self, org_id: str) -> None:
+        self._versions[org_id] = self._versions.get(org_id, 0) + 1
+        self._snapshots.delete(org_id)
+
+    async def set_flags(self, sb: AsyncClient, org_ids: list[str], updates: dict[str, bool]) -> list[dict]:
+        """Write `updates` (module key -> enabled) for every org in one round-trip and return the
+        written rows. Cached snapshots are updated in place rather than re-read; uncached orgs are
+        left uncached by the plain upsert, which only returns the rows it wrote."""
+        if settings.module_flags_use_rpc:
+            res = await sb.rpc("set_org_modules", {"_org_ids": org_ids, "_updates": updates}).execute()
+            enabled: dict[str, set[str]] = {org_id: set() for org_id in org_ids}
+            for r in res.data or []:
+                if r["is_enabled"]:
+                    enabled[r["org_id"]].add(r["key"])
+            for org_id, keys in enabled.items():
+                self.replace(org_id, keys)
+            return [
+                {"org_id": r["org_id"], "module_key": r["key"], "is_enabled": r["is_enabled"]}
+                for r in res.data or []
+                if r["key"] in updates
+            ]
+
+        rows = [{"org_id": o, "module_key": k, "is_enabled": v} for o in org_ids for k, v in updates.items()]
+        res = await sb.table("org_modules").upsert(rows, on_conflict="org_id,module_key").execute()
+        written = [{"org_id": r["org_id"], "module_key": r["module_key"], "is_enabled": r["is_enabled"]} for r in res.data or []]
+        by_org: dict[str, list[dict]] = {}
+        for r in written:
+            by_org.setdefault(r["org_id"], []).append(r)
+        for org_id in org_ids:
+            self.apply(org_id, by_org.get(org_id, []))
+        return written
+
+    def apply(self, org_id: str, rows: list[dict]) -> None:
+        """Fold rows written to org_modules into the cached snapshot instead of dropping it,
+        so the next read needs no query. Without a cached snapshot this is invalidate()."""
+        prev = self._snapshots.get(org_id)
+        current = prev is not None and prev.version == self._versions.get(org_id, 0)
+        self.invalidate(org_id)
+        if current:
+            on = {r["module_key"] for r in rows if r["is_enabled"]}
+            off = {r["module_key"] for r in rows if not r["is_enabled"]}
+            self._store(org_id, (prev.enabled - off) | on)
+
+    def replace(self, org_id: str, enabled: set[str]) -> None:
+        """Install a complete, freshly read flag set for an org."""
+        self.invalidate(org_id)
+        self._store(org_id, enabled)
+
+    def _store(self, org_id: str, enabled: set[str]) -> None:
+        snap = OrgModules(org_id=org_id, version=self._versions.get(org_id, 0), enabled=LOCKED_ON | frozenset(enabled))
+        self._snapshots.set(org_id, snap)
+
+
+module_flags = ModuleFlagService()
+
+
+def require_module(key: str):
+    """Dependency factory: 403 unless `key` is enabled for the request's org (see AuthContext.org_id)."""
+
+    async def dependency(ctx: AuthContext = Depends(get_auth_context)) -> AuthContext:
+        org_id = await ctx.org_id()
+        if org_id:
+            snap = await module_flags.for_org(await get_service_client(), org_id)
+            if snap.is_enabled(key):
+                return ctx
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Module '{key}' is not enabled")
+
+    return dependency
@@ -0,0 +1,65 @@
+import base64
+import json
+import re
+import uuid
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response, status
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# List bodies stay plain JSON arrays; the cursor for the next page travels in this header.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# created_at as PostgREST renders timestamptz, e.g. 2025-01-01T00:00:16.123456+00:00.
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}(:?\d{2})?)?")
+
+
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    # Cursors come back from the client: only a timestamp and a uuid may reach the PostgREST filter.
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        if not isinstance(created_at, str) or not _TIMESTAMP.fullmatch(created_at):
+            raise ValueError("created_at is not a timestamp")
+        row_id = str(uuid.UUID(row_id))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+    return created_at, row_id
+
+
+def _quote(value: str) -> str:
+    # PostgREST logic trees need values with reserved characters (timestamps have '.' and ':') quoted.
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset(query: Any, cursor: Optional[str], desc: bool) -> Any:
+    """Order by (created_at, id) and, given a cursor, continue strictly after it."""
+    query = query.order("created_at", desc=desc).order("id", desc=desc)
+    if not cursor:
+        return query
+    created_at, row_id = decode_cursor(cursor)
+    op = "lt" if desc else "gt"
+    ts = _quote(created_at)
+    return query.or_(f"created_at.{op}.{ts},and(created_at.eq.{ts},id.{op}.{_quote(row_id)})")
+
+
+async def fetch_page(query: Any, *, limit: int, cursor: Optional[str], desc: bool) -> tuple[list[dict], Optional[str]]:
+    # One extra row tells us whether another page exists without a count query.
+    res = await keyset(query, cursor, desc).limit(limit + 1).execute()
+    rows = res.data or []
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,84 @@
+"""Async read helpers shared by the routers. Each helper is one PostgREST round-trip (table read or RPC)."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from app.core.pagination import fetch_page
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+# Projections matching OrgResponse / MemberResponse; list endpoints never select("*").
+ORG_COLUMNS = "id,name,status,created_at"
+MEMBER_COLUMNS = "id,org_id,user_id,role,created_at"
+
+
+def prefix_pattern(prefix: str) -> str:
+    """ILIKE pattern for values starting with `prefix`; % and _ in the input match literally."""
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("*", "")
+    return f"{escaped}*"
+
+
+async def is_system_admin(sb: AsyncClient, user_id: str) -> bool:
+    sa = await sb.table("system_admins").select("user_id").eq("user_id", user_id).execute()
+    return bool(sa.data)
+
+
+async def memberships(sb: AsyncClient, user_id: str) -> list[dict]:
+    mem = await (
+        sb.table("org_members")
+        .select("org_id,role,created_at")
+        .eq("user_id", user_id)
+        .order("created_at", desc=False)
+        .execute()
+    )
+    return mem.data or []
+
+
+async def member_role(sb: AsyncClient, user_id: str, org_id: str) -> Optional[str]:
+    # Point lookup on the (org_id, user_id) unique index.
+    res = await sb.table("org_members").select("role").eq("org_id", org_id).eq("user_id", user_id).limit(1).execute()
+    return res.data[0]["role"] if res.data else None
+
+
+async def module_catalog(sb: AsyncClient) -> list[dict]:
+    res = await sb.table("modules").select("key,name").order("key", desc=False).execute()
+    return res.data or []
+
+
+async def org_module_flags(sb: AsyncClient, org_id: str) -> list[dict]:
+    res = await sb.table("org_modules").select("module_key,is_enabled").eq("org_id", org_id).execute()
+    return res.data or []
+
+
+async def me_view(sb: AsyncClient, user_id: str) -> dict:
+    """{user_id, is_system_admin, memberships: [{org_id, role}], default_org_id} via get_me()."""
+    res = await sb.rpc("get_me", {"_user_id": user_id}).execute()
+    return res.data
+
+
+async def org_modules_view(sb: AsyncClient, user_id: str) -> dict:
+    """{org_id, memberships, modules: [{key, name, is_enabled}]} for the user's default org via get_org_modules_for_user()."""
+    res = await sb.rpc("get_org_modules_for_user", {"_user_id": user_id}).execute()
+    return res.data
+
+
+async def org_page(
+    sb: AsyncClient, *, status: Optional[str], name_prefix: Optional[str], limit: int, cursor: Optional[str]
+) -> tuple[list[dict], Optional[str]]:
+    q = sb.table("organizations").select(ORG_COLUMNS)
+    if status is not None:
+        q = q.eq("status", status)
+    if name_prefix is not None:
+        q = q.ilike("name", prefix_pattern(name_prefix))
+    return await fetch_page(q, limit=limit, cursor=cursor, desc=True)
+
+
+async def member_page(
+    sb: AsyncClient, org_id: str, *, role: Optional[str], limit: int, cursor: Optional[str]
+) -> tuple[list[dict], Optional[str]]:
+    q = sb.table("org_members").select(MEMBER_COLUMNS).eq("org_id", org_id)
+    if role is not None:
+        q = q.eq("role", role)
+    return await fetch_page(q, limit=limit, cursor=cursor, desc=False)
@@ -0,0 +1,234 @@
+"""Admission control: per-user and per-org token buckets plus per-tenant concurrency caps.
+
+RateLimitMiddleware runs before routing's dependencies, so a throttled request is rejected with 429
+before any database work. It matches the route (for its cost and template), identifies the caller
+from the bearer token (verify_jwt's cache makes the later dependency call free), and resolves the
+tenant org, never from the database. The org named by the path or X-Org-Id is used only when the
+cached admin flag or memberships allow the caller to act on it. Otherwise the tenant is the org in
+the token's claims or the caller's cached default org.
+
+Buckets and concurrency counters live in process memory, or in Redis (shared by every worker)
+when CACHE_REDIS_URL is set. Backend errors admit the request and are counted.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from starlette.routing import Match
+
+from app.core.authz import ORG_HEADER, cached_default_org, cached_may_act_on
+from app.core.config import settings
+from app.core.metrics import REQUESTS_THROTTLED
+from app.core.security import AuthedUser, verify_jwt
+
+# Cost in tokens per route (default 1): calls that walk whole tables or write in bulk cost more.
+ROUTE_COSTS: dict[tuple[str, str], float] = {
+    ("GET", "/admin/orgs/export"): 20,
+    ("GET", "/admin/orgs/{org_id}/members/export"): 20,
+    ("POST", "/admin/orgs/{org_id}/members/bulk"): 20,
+    ("POST", "/admin/modules/rollout"): 10,
+    ("PATCH", "/admin/modules"): 5,
+}
+EXEMPT_PATHS = ("/healthz", "/readyz", "/metrics")
+_MAX_KEYS = 100_000
+
+
+class _MemoryBackend:
+    def __init__(self):
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._active: dict[str, int] = {}
+
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        """Take `cost` tokens; returns 0 if admitted, else seconds until enough tokens accrue."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > _MAX_KEYS:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def acquire(self, key: str, cap: int) -> bool:
+        active = self._active.get(key, 0)
+        if active >= cap:
+            return False
+        self._active[key] = active + 1
+        return True
+
+    async def release(self, key: str) -> None:
+        active = self._active.get(key, 0) - 1
+        if active > 0:
+            self._active[key] = active
+        else:
+            self._active.pop(key, None)
+
+
+# Token bucket in one round-trip; Redis' clock keeps every worker on the same time base.
+_TAKE = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or burst
+local ts = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class _RedisBackend:
+    # Concurrency counters expire as a backstop for workers that die holding slots.
+    SLOT_TTL_SECONDS = 300
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_REDIS_URL is set but the 'redis' package is not installed") from e
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(_TAKE)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        return float(await self._take(keys=[f"ratelimit:{key}"], args=[rate, burst, cost]))
+
+    async def acquire(self, key: str, cap: int) -> bool:
+        k = f"ratelimit:active:{key}"
+        active = await self._redis.incr(k)
+        await self._redis.expire(k, self.SLOT_TTL_SECONDS)
+        if active > cap:
+            await self._redis.decr(k)
+            return False
+        return True
+
+    async def release(self, key: str) -> None:
+        await self._redis.decr(f"ratelimit:active:{key}")
+
+
+class RateLimiter:
+    def __init__(self, redis_url: str = ""):
+        self._backend = _RedisBackend(redis_url) if redis_url else _MemoryBackend()
+        self.errors = 0
+
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        try:
+            return await self._backend.take(key, rate, burst, min(cost, burst))
+        except Exception:
+            self.errors += 1
+            return 0.0
+
+    async def acquire(self, key: str, cap: int) -> bool:
+        try:
+            return await self._backend.acquire(key, cap)
+        except Exception:
+            self.errors += 1
+            return True
+
+    async def release(self, key: str) -> None:
+        try:
+            await self._backend.release(key)
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.rate_limit_enabled,
+            "backend": "redis" if isinstance(self._backend, _RedisBackend) else "memory",
+            "errors": self.errors,
+        }
+
+
+limiter = RateLimiter(settings.cache_redis_url)
+
+
+def _match(scope) -> tuple[Optional[object], dict]:
+    for route in scope["app"].router.routes:
+        match, child = route.matches(scope)
+        if match == Match.FULL:
+            return route, child.get("path_params", {})
+    return None, {}
+
+
+async def _caller(scope) -> Optional[AuthedUser]:
+    try:
+        return await verify_jwt(Request(scope))
+    except HTTPException:
+        # Missing or invalid token: the route answers 401 itself.
+        return None
+    except Exception:
+        return None
+
+
+def _claimed_org(user: AuthedUser) -> Optional[str]:
+    # Custom access-token hooks may put the active org in the claims.
+    meta = user.claims.get("app_metadata")
+    return user.claims.get("org_id") or (meta.get("org_id") if isinstance(meta, dict) else None)
+
+
+def _throttled(detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=429, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.rate_limit_enabled
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            return await self.app(scope, receive, send)
+
+        route, path_params = _match(scope)
+        template = getattr(route, "path", None) or "unmatched"
+        if route is not None:
+            # Lets MetricsMiddleware label throttled requests with their route.
+            scope["route"] = route
+        user = await _caller(scope)
+        if user is None:
+            return await self.app(scope, receive, send)
+
+        cost = ROUTE_COSTS.get((scope["method"], template), 1)
+        wait = await limiter.take(f"user:{user.user_id}", settings.rate_limit_user_per_second, settings.rate_limit_user_burst, cost)
+        if wait:
+            REQUESTS_THROTTLED.inc((template, "user_rate"))
+            return await _throttled("Rate limit exceeded", wait)(scope, receive, send)
+
+        org_id = None
+        requested = path_params.get("org_id") or Request(scope).headers.get(ORG_HEADER)
+        if requested and await cached_may_act_on(user.user_id, requested.strip().lower()):
+            org_id = requested.strip().lower()
+        # An org the caller can't be shown to act on is never charged, so no one can drain another
+        # tenant's budget; they are charged to their own org instead.
+        org_id = org_id or _claimed_org(user) or await cached_default_org(user.user_id)
+        if org_id:
+            wait = await limiter.take(f"org:{org_id}", settings.rate_limit_org_per_second, settings.rate_limit_org_burst, cost)
+            if wait:
+                REQUESTS_THROTTLED.inc((template, "org_rate"))
+                return await _throttled("Organization rate limit exceeded", wait)(scope, receive, send)
+
+        tenant = f"org:{org_id}" if org_id else f"user:{user.user_id}"
+        if not await limiter.acquire(tenant, settings.rate_limit_tenant_concurrency):
+            REQUESTS_THROTTLED.inc((template, "concurrency"))
+            return await _throttled("Too many concurrent requests", 1)(scope, receive, send)
+        try:
+            # Held until the response (streamed exports included) has been sent.
+            await self.app(scope, receive, send)
+        finally:
+            await limiter.release(tenant)
@@ -0,0 +1,43 @@
+"""Opt-in fast serialization for list endpoints (FAST_RESPONSES).
+
+By default handlers return plain rows and FastAPI validates them against response_model field by
+field, converts them with jsonable_encoder-style serialization and then json.dumps the result.
+"validated" does the same validation in one pass through a prebuilt TypeAdapter and lets pydantic-core
+write the JSON. "trusted" skips validation for rows that already match the schema (projected DB rows
+and the module-flag service's dicts) and writes them with orjson when it is installed.
+"""
+
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.schemas import MemberResponse, ModuleFlag, OrgModuleFlag, OrgResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+ORG_LIST = TypeAdapter(list[OrgResponse])
+MEMBER_LIST = TypeAdapter(list[MemberResponse])
+MODULE_FLAG_LIST = TypeAdapter(list[ModuleFlag])
+ORG_MODULE_FLAG_LIST = TypeAdapter(list[OrgModuleFlag])
+
+
+def render(adapter: TypeAdapter, rows: list[dict], trusted: bool) -> bytes:
+    if trusted and orjson is not None:
+        return orjson.dumps(rows)
+    if trusted:
+        return adapter.dump_json(rows, warnings=False)
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+def fast_list(adapter: TypeAdapter, rows: list[dict], response: Response) -> Any:
+    """Return value for a list handler: `rows` unchanged, or a pre-rendered response carrying the
+    headers already set on `response` (cursor, ETag, ...)."""
+    if settings.fast_responses == "off":
+        return rows
+    body = render(adapter, rows, trusted=settings.fast_responses == "trusted")
+    return Response(body, media_type="application/json", headers=dict(response.headers))
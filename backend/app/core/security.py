@@ -1,11 +1,18 @@
+import asyncio
+import hashlib
+import time
 from dataclasses import dataclass
 from typing import Optional
 
-import httpx
 from fastapi import HTTPException, Request, status
 from jose import JWTError, jwt
 
+from app.core.cache import SingleFlight, TTLCache, register
 from app.core.config import settings
+from app.core.metrics import auth_timer
+from app.core.supabase import get_http_client
+
+ASYMMETRIC_ALGS = ("RS256", "ES256")
 
 
 @dataclass(frozen=True)
@@ -15,6 +22,58 @@ class AuthedUser:
     claims: dict
 
 
+# Verified users keyed by sha256(token); entries live until the token's exp or the configured ceiling.
+_token_cache = TTLCache(maxsize=settings.auth_cache_max_entries, ttl=settings.auth_cache_ttl_seconds)
+register("auth_tokens", _token_cache)
+_inflight = SingleFlight()
+
+
+class _JwksStore:
+    """Supabase asymmetric signing keys, fetched once and refreshed in the background."""
+
+    def __init__(self):
+        self._keys: dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def url(self) -> str:
+        return f"{settings.supabase_url}/auth/v1/.well-known/jwks.json"
+
+    async def _fetch(self) -> None:
+        r = await get_http_client().get(self.url, headers={"apikey": settings.supabase_service_role_key})
+        r.raise_for_status()
+        self._keys = {k["kid"]: k for k in r.json().get("keys", []) if k.get("kid")}
+        self._fetched_at = time.monotonic()
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self._fetch()
+        except Exception:
+            pass
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_quietly())
+
+    async def get(self, kid: str) -> Optional[dict]:
+        age = time.monotonic() - self._fetched_at
+        if not self._fetched_at or (kid not in self._keys and age > settings.supabase_jwks_min_refresh_seconds):
+            # First use, or an unknown kid (key rotation): fetch inline, once per min-refresh window.
+            await _inflight.do(("jwks",), self._fetch)
+        elif age > settings.supabase_jwks_refresh_seconds:
+            self._refresh_in_background()
+        return self._keys.get(kid)
+
+
+_jwks = _JwksStore()
+
+
+async def prefetch_jwks() -> None:
+    """Startup warm-up: load the signing keys and open the Auth API connection. Best effort."""
+    await _jwks._refresh_quietly()
+
+
 def _bearer_token(req: Request) -> str:
     auth = req.headers.get("authorization") or ""
     if not auth.lower().startswith("bearer "):
@@ -22,20 +81,21 @@ def _bearer_token(req: Request) -> str:
     return auth.split(" ", 1)[1].strip()
 
 
-def verify_jwt(req: Request) -> AuthedUser:
-    token = _bearer_token(req)
-    if settings.supabase_jwt_secret:
-        try:
-            claims = jwt.decode(token, settings.supabase_jwt_secret, algorithms=["HS256"])
-        except JWTError as e:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from e
+def _user_from_claims(claims: dict) -> AuthedUser:
+    user_id = claims.get("sub")
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token (missing sub)")
+    return AuthedUser(user_id=user_id, email=claims.get("email"), claims=claims)
+
 
-        user_id = claims.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token (missing sub)")
+def _decode(token: str, key, alg: str) -> dict:
+    try:
+        return jwt.decode(token, key, algorithms=[alg], audience=settings.supabase_jwt_audience or None)
+    except JWTError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from e
 
-        return AuthedUser(user_id=user_id, email=claims.get("email"), claims=claims)
 
+async def _verify_via_auth_api(token: str) -> AuthedUser:
     # Fallback: verify token by calling Supabase Auth API (works without local JWT secret).
     if not settings.supabase_url or not settings.supabase_service_role_key:
         raise HTTPException(
@@ -49,7 +109,7 @@ def verify_jwt(req: Request) -> AuthedUser:
         "authorization": f"Bearer {token}",
     }
     try:
-        r = httpx.get(url, headers=headers, timeout=10.0)
+        r = await get_http_client().get(url, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Auth verification failed") from e
 
@@ -63,3 +123,52 @@ def verify_jwt(req: Request) -> AuthedUser:
 
     claims = {"sub": user_id, "email": data.get("email"), "verified_via": "supabase_auth_api"}
     return AuthedUser(user_id=user_id, email=data.get("email"), claims=claims)
+
+
+async def _verify_uncached(token: str) -> AuthedUser:
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from e
+    alg = header.get("alg")
+
+    if alg == "HS256" and settings.supabase_jwt_secret:
+        return _user_from_claims(_decode(token, settings.supabase_jwt_secret, alg))
+
+    if alg in ASYMMETRIC_ALGS and header.get("kid") and settings.supabase_url:
+        try:
+            key = await _jwks.get(header["kid"])
+        except Exception:
+            key = None
+        if key is not None:
+            return _user_from_claims(_decode(token, key, alg))
+
+    return await _verify_via_auth_api(token)
+
+
+def _cache_ttl(user: AuthedUser, token: str) -> float:
+    exp = user.claims.get("exp")
+    if exp is None:
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            exp = None
+    if exp is None:
+        return settings.auth_cache_ttl_seconds
+    return float(exp) - time.time()
+
+
+async def verify_jwt(req: Request) -> AuthedUser:
+    with auth_timer():
+        token = _bearer_token(req)
+        key = hashlib.sha256(token.encode()).hexdigest()
+        cached = _token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def verify() -> AuthedUser:
+            user = await _verify_uncached(token)
+            _token_cache.set(key, user, ttl=_cache_ttl(user, token))
+            return user
+
+        return await _inflight.do(key, verify)
@@ -1,9 +1,150 @@
-from supabase import Client, create_client
+from __future__ import annotations
+
+import asyncio
+from functools import cache
+from typing import TYPE_CHECKING, Optional
+
+import httpx
 
 from app.core.config import settings
+from app.core.metrics import TimedTransport
+from app.core.upstream import ResilientTransport
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+# One Supabase client (and one keep-alive pool) per process. Built in the FastAPI lifespan hook;
+# get_service_client() lazily builds it if the hook did not run (scripts, tests).
+_client: Optional[AsyncClient] = None
+_http: Optional[httpx.AsyncClient] = None
+_lock = asyncio.Lock()
+# Requests sent over a freshly opened connection vs an already open (keep-alive or HTTP/2) one.
+_stats = {"connections_opened": 0, "connections_reused": 0}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.supabase_pool_max_connections,
+        max_keepalive_connections=settings.supabase_pool_max_keepalive,
+        keepalive_expiry=settings.supabase_pool_keepalive_expiry,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.supabase_read_timeout, connect=settings.supabase_connect_timeout)
+
+
+class _CountingHTTPTransport(httpx.AsyncHTTPTransport):
+    """Counts whether each request had to open a connection, from httpcore's trace events."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        opened = False
+        outer = request.extensions.get("trace")
+
+        async def trace(name: str, info: dict) -> None:
+            nonlocal opened
+            if name == "connection.connect_tcp.complete":
+                opened = True
+            if outer is not None:
+                await outer(name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        response = await super().handle_async_request(request)
+        _stats["connections_opened" if opened else "connections_reused"] += 1
+        return response
+
+
+def _transport(**kwargs) -> ResilientTransport:
+    # Deadlines, retries, circuit breaking and GET coalescing outside; per-attempt timing inside.
+    return ResilientTransport(TimedTransport(_CountingHTTPTransport(limits=_limits(), **kwargs)))
+
 
+@cache
+def _client_class() -> type[AsyncClient]:
+    # Importing supabase-py also loads its auth, realtime and storage clients (~100ms), none of which
+    # the API uses; defer it to the lifespan warm-up (or the first request) instead of import time.
+    from postgrest import AsyncPostgrestClient
+    from supabase import AsyncClient
 
-def get_service_client() -> Client:
+    class _PooledPostgrestClient(AsyncPostgrestClient):
+        def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+            return httpx.AsyncClient(
+                base_url=base_url,
+                headers=headers,
+                timeout=timeout,
+                follow_redirects=True,
+                transport=_transport(verify=verify, proxy=proxy, http2=True),
+            )
+
+    class _PooledClient(AsyncClient):
+        @staticmethod
+        def _init_postgrest_client(rest_url, headers, schema, timeout=None, verify=True, proxy=None):
+            return _PooledPostgrestClient(
+                rest_url,
+                headers=headers,
+                schema=schema,
+                timeout=timeout if timeout is not None else _timeout(),
+                verify=verify,
+                proxy=proxy,
+            )
+
+    return _PooledClient
+
+
+def _require_configured() -> None:
     if not settings.supabase_url or not settings.supabase_service_role_key:
         raise RuntimeError("Supabase service client is not configured (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY missing)")
-    return create_client(settings.supabase_url, settings.supabase_service_role_key)
+
+
+async def init_service_client() -> Optional[AsyncClient]:
+    """Build the shared client. No-op (returns None) while Supabase is not configured."""
+    global _client
+    if not settings.supabase_url or not settings.supabase_service_role_key:
+        return None
+    async with _lock:
+        if _client is None:
+            from supabase import AsyncClientOptions
+
+            _client = await _client_class().create(
+                settings.supabase_url,
+                settings.supabase_service_role_key,
+                AsyncClientOptions(postgrest_client_timeout=_timeout()),
+            )
+    get_http_client()
+    return _client
+
+
+async def close_service_client() -> None:
+    global _client, _http
+    async with _lock:
+        if _client is not None:
+            await _client.postgrest.aclose()
+        if _http is not None:
+            await _http.aclose()
+        _client = None
+        _http = None
+
+
+async def get_service_client() -> AsyncClient:
+    _require_configured()
+    client = _client
+    if client is not None:
+        return client
+    return await init_service_client()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled async httpx client for direct Supabase Auth API calls."""
+    global _http
+    _require_configured()
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=_timeout(), transport=_transport())
+    return _http
+
+
+def pool_stats() -> dict:
+    return {
+        **_stats,
+        "max_connections": settings.supabase_pool_max_connections,
+        "max_keepalive": settings.supabase_pool_max_keepalive,
+    }
@@ -0,0 +1,168 @@
+"""Resilience layer for every upstream HTTP call (PostgREST and the Auth API).
+
+ResilientTransport wraps the pooled transport in app/core/supabase.py, so the Supabase client, the
+Auth API calls in security.py / users.py and everything built on them get the same policy:
+
+- a total deadline per call (UPSTREAM_DEADLINE_SECONDS), retries included;
+- jittered retries of idempotent reads (GET/HEAD) on transport errors and 502/503/504;
+- a circuit breaker per service that, after CIRCUIT_FAILURE_THRESHOLD consecutive failures, fails
+  calls immediately for CIRCUIT_OPEN_SECONDS, then lets a single probe through;
+- coalescing of identical in-flight GETs (same URL and headers, so never across users).
+
+Calls that cannot be made raise UpstreamUnavailable, which app.main turns into a 503.
+"""
+
+import asyncio
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from app.core.cache import SingleFlight
+from app.core.config import settings
+from app.core.metrics import classify
+
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+RETRY_STATUSES = (502, 503, 504)
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """The circuit is open or the call ran out of time; `retry_after` is a hint in seconds."""
+
+    def __init__(self, message: str, request: Optional[httpx.Request] = None, retry_after: Optional[float] = None):
+        super().__init__(message, request=request)
+        self.retry_after = retry_after
+
+
+def full_jitter(attempt: int, base: float, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2^(attempt-1))]."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open (fail fast) -> half-open (one probe) -> closed."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.opens = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= settings.circuit_open_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self, request: httpx.Request) -> bool:
+        """Raise if calls are being shed; returns True when this call is the half-open probe."""
+        if self._opened_at is None:
+            return False
+        wait = self._opened_at + settings.circuit_open_seconds - time.monotonic()
+        if wait > 0 or self._probing:
+            raise UpstreamUnavailable(f"{self.name} circuit open", request=request, retry_after=max(wait, 1.0))
+        self._probing = True
+        return True
+
+    def record(self, ok: bool) -> None:
+        self._probing = False
+        if ok:
+            self.failures = 0
+            self._opened_at = None
+            return
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= settings.circuit_failure_threshold:
+            if self._opened_at is None:
+                self.opens += 1
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        # The probe was abandoned (cancelled) without an outcome; let the next call probe.
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "opens": self.opens}
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(service: str) -> CircuitBreaker:
+    breaker = _breakers.get(service)
+    if breaker is None:
+        breaker = _breakers[service] = CircuitBreaker(service)
+    return breaker
+
+
+def breaker_stats() -> dict:
+    return {name: b.stats() for name, b in sorted(_breakers.items())}
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self._inner = inner
+        self._inflight = SingleFlight()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET" or not settings.upstream_coalesce_gets:
+            return await self._send(request)
+        key = (str(request.url), tuple(request.headers.multi_items()))
+        status_code, headers, content = await self._inflight.do(key, lambda: self._send_buffered(request))
+        # Every waiter gets its own Response over the shared (raw, still-encoded) body.
+        return httpx.Response(status_code, headers=headers, content=content, request=request)
+
+    async def _send_buffered(self, request: httpx.Request) -> tuple[int, list, bytes]:
+        response = await self._send(request)
+        try:
+            content = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        return response.status_code, response.headers.multi_items(), content
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        breaker = breaker_for(classify(request.url)[0])
+        retries = settings.upstream_read_retries if request.method in IDEMPOTENT_METHODS else 0
+        deadline = time.monotonic() + settings.upstream_deadline_seconds
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = breaker.allow(request)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if probe:
+                    breaker.release()
+                raise UpstreamUnavailable("upstream deadline exceeded", request=request)
+            try:
+                response = await asyncio.wait_for(self._inner.handle_async_request(request), remaining)
+            except (httpx.TransportError, asyncio.TimeoutError) as e:
+                breaker.record(False)
+                if attempt <= retries and not isinstance(e, asyncio.TimeoutError):
+                    await self._pause(attempt, deadline)
+                    continue
+                if isinstance(e, asyncio.TimeoutError):
+                    raise UpstreamUnavailable("upstream deadline exceeded", request=request) from e
+                raise
+            except BaseException:
+                if probe:
+                    breaker.release()
+                raise
+
+            if response.status_code not in RETRY_STATUSES:
+                breaker.record(True)
+                return response
+            breaker.record(False)
+            if attempt > retries:
+                return response
+            await response.aclose()
+            await self._pause(attempt, deadline)
+
+    async def _pause(self, attempt: int, deadline: float) -> None:
+        delay = full_jitter(attempt, settings.upstream_retry_base_seconds)
+        await asyncio.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
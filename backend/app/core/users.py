@@ -0,0 +1,137 @@
+import asyncio
+from typing import Iterable, Optional
+
+import httpx
+
+from app.core.cache import SingleFlight, TTLCache, register
+from app.core.config import settings
+from app.core.supabase import get_http_client, get_service_client
+
+# Lowercased email -> user id, or "" for an email known not to exist (cached for the shorter
+# USER_LOOKUP_NEGATIVE_TTL_SECONDS). Upstream errors are never cached.
+_NOT_FOUND = ""
+_email_cache = TTLCache(maxsize=settings.user_lookup_cache_max_entries, ttl=settings.user_lookup_cache_ttl_seconds)
+_inflight = SingleFlight()
+register("user_emails", _email_cache)
+
+# PostgREST `in.(...)` lists travel in the query string; keep them well under URL limits.
+_TABLE_BATCH = 100
+# Users per page when the Auth admin API has to be paged through (GoTrue caps per_page at 1000).
+_AUTH_PAGE_SIZE = 1000
+
+
+def _normalize(email: str) -> str:
+    return email.strip().lower()
+
+
+def _remember(email: str, user_id: Optional[str]) -> None:
+    if user_id:
+        _email_cache.set(email, user_id)
+    else:
+        _email_cache.set(email, _NOT_FOUND, ttl=settings.user_lookup_negative_ttl_seconds)
+
+
+async def _lookup_auth_api(email: str) -> tuple[Optional[str], bool]:
+    """(user id or None, whether the search was complete). Only a complete miss may be cached."""
+    url = f"{settings.supabase_url}/auth/v1/admin/users"
+    headers = {
+        "apikey": settings.supabase_service_role_key,
+        "authorization": f"Bearer {settings.supabase_service_role_key}",
+    }
+    for page in range(1, settings.user_lookup_max_pages + 1):
+        params = {"email": email, "page": page, "per_page": _AUTH_PAGE_SIZE}
+        r = await get_http_client().get(url, headers=headers, params=params)
+        r.raise_for_status()
+        data = r.json()
+        users = (data.get("users") if isinstance(data, dict) else None) or []
+        emails = [_normalize(u.get("email") or "") for u in users]
+        for u, e in zip(users, emails):
+            if e == email:
+                return u.get("id"), True
+        # A GoTrue that honours the filter returns only matches (here: none), so the miss is final.
+        # Older versions ignore it and list every user a page at a time; keep paging until the end.
+        if all(e == email for e in emails) or len(users) < _AUTH_PAGE_SIZE:
+            return None, True
+    return None, False
+
+
+async def _lookup_table(emails: list[str]) -> dict[str, str]:
+    sb = await get_service_client()
+    res = await sb.table("auth_user_lookup").select("user_id,email").in_("email", emails).execute()
+    return {r["email"]: r["user_id"] for r in res.data or []}
+
+
+async def _load(email: str) -> Optional[str]:
+    if settings.user_lookup_source == "table":
+        user_id, complete = (await _lookup_table([email])).get(email), True
+    else:
+        user_id, complete = await _lookup_auth_api(email)
+    if user_id or complete:
+        _remember(email, user_id)
+    return user_id
+
+
+async def get_user_id_by_email(email: str) -> Optional[str]:
+    """Resolve an existing user's id by email; None if unknown or the lookup failed.
+
+    Transport errors (Auth API down, circuit open, deadline) propagate, so the caller answers 503
+    rather than "unknown user".
+    """
+    email = _normalize(email)
+    if not email:
+        return None
+    cached = _email_cache.get(email)
+    if cached is not None:
+        return cached or None
+    try:
+        return await _inflight.do(email, lambda: _load(email))
+    except httpx.TransportError:
+        raise
+    except Exception:
+        return None
+
+
+async def _resolve(email: str) -> Optional[str]:
+    try:
+        return await _inflight.do(email, lambda: _load(email))
+    except Exception:
+        return None
+
+
+async def resolve_emails(emails: Iterable[str], concurrency: Optional[int] = None) -> dict[str, Optional[str]]:
+    """Resolve many emails to user ids. Keys are the lowercased emails; unknown or failed lookups map to None.
+
+    With USER_LOOKUP_SOURCE=table, cache misses are fetched in batched `in.(...)` queries; otherwise
+    they go to the Auth admin API `concurrency` at a time over the shared connection pool.
+    """
+    unique = sorted({_normalize(e) for e in emails if e and e.strip()})
+    resolved: dict[str, Optional[str]] = {}
+    missing: list[str] = []
+    for email in unique:
+        cached = _email_cache.get(email)
+        if cached is None:
+            missing.append(email)
+        else:
+            resolved[email] = cached or None
+
+    if settings.user_lookup_source == "table":
+        for i in range(0, len(missing), _TABLE_BATCH):
+            batch = missing[i : i + _TABLE_BATCH]
+            try:
+                found = await _lookup_table(batch)
+            except Exception:
+                resolved.update(dict.fromkeys(batch))
+                continue
+            for email in batch:
+                _remember(email, found.get(email))
+                resolved[email] = found.get(email)
+        return resolved
+
+    sem = asyncio.Semaphore(concurrency or settings.user_lookup_concurrency)
+
+    async def one(email: str) -> Optional[str]:
+        async with sem:
+            return await _resolve(email)
+
+    resolved.update(zip(missing, await asyncio.gather(*(one(e) for e in missing))))
+    return resolved
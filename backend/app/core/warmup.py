@@ -0,0 +1,62 @@
+"""Startup warm-up and readiness.
+
+The lifespan hook runs warm_up() in the background. It builds the pooled Supabase client, which is
+also where supabase-py gets imported. It then makes a first real PostgREST query, loading the module
+catalog every flag route needs, so the first request doesn't pay for the connection (TCP, TLS,
+HTTP/2). It also fetches the JWKS over the Auth API pool. GET /readyz answers 503 until this has
+succeeded once, so the load balancer only routes to warm workers; /healthz stays a plain liveness
+probe. Failed attempts are retried with backoff, and the job runner starts once the worker is warm.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.core import jobs
+from app.core.module_flags import module_flags
+from app.core.security import prefetch_jwks
+from app.core.supabase import init_service_client
+from app.core.upstream import full_jitter
+
+logger = logging.getLogger("app.startup")
+
+RETRY_BASE_SECONDS = 0.5
+RETRY_CAP_SECONDS = 30.0
+
+
+class Readiness:
+    def __init__(self):
+        self.ready = False
+        self.attempts = 0
+        self.warm_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "warm_seconds": self.warm_seconds, "attempts": self.attempts, "error": self.error}
+
+
+readiness = Readiness()
+
+
+async def warm_up() -> None:
+    start = time.monotonic()
+    while True:
+        readiness.attempts += 1
+        try:
+            sb = await init_service_client()
+            if sb is None:
+                readiness.error = "Supabase is not configured (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY missing)"
+                return
+            await asyncio.gather(module_flags.catalog(sb), prefetch_jwks())
+            break
+        except Exception as e:
+            readiness.error = str(e) or type(e).__name__
+            logger.warning("warm-up attempt %d failed: %s", readiness.attempts, readiness.error)
+            await asyncio.sleep(full_jitter(readiness.attempts, RETRY_BASE_SECONDS, RETRY_CAP_SECONDS))
+
+    await jobs.runner.start()
+    readiness.warm_seconds = round(time.monotonic() - start, 3)
+    readiness.error = None
+    readiness.ready = True
+    logger.info("warm after %.3fs (%d attempt(s))", readiness.warm_seconds, readiness.attempts)
@@ -1,25 +1,73 @@
-from fastapi import FastAPI
+import asyncio
+import math
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core import jobs, metrics, warmup
 from app.core.config import settings
-from app.routers import admin_orgs, me, org
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.supabase import close_service_client
+from app.routers import admin_jobs, admin_orgs, admin_stats, me, org
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: /healthz answers at once, /readyz once the worker is warm.
+    warm = asyncio.create_task(warmup.warm_up())
+    yield
+    warm.cancel()
+    await asyncio.gather(warm, return_exceptions=True)
+    await jobs.runner.stop()
+    await close_service_client()
 
-app = FastAPI(title="HR SaaS API", version="0.1.0")
 
+app = FastAPI(title="HR SaaS API", version="0.1.0", lifespan=lifespan)
+
+# Outermost last: metrics see every request, CORS headers reach 429s, admission runs before routing.
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origin_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Retry-After"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+@app.exception_handler(httpx.TransportError)
+async def upstream_unavailable(request: Request, exc: httpx.TransportError):
+    # Supabase unreachable, out of time or shed by the circuit breaker (app/core/upstream.py).
+    retry_after = getattr(exc, "retry_after", None)
+    headers = {"Retry-After": str(math.ceil(retry_after))} if retry_after else None
+    return JSONResponse({"detail": "Upstream unavailable"}, status_code=503, headers=headers)
 
 
 @app.get("/healthz")
 def healthz():
+    # Public liveness probe: no internals (those are on GET /admin/stats).
     return {"ok": True}
 
 
+@app.get("/readyz")
+def readyz():
+    status = warmup.readiness.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(me.router)
 app.include_router(admin_orgs.router)
+app.include_router(admin_jobs.router)
+app.include_router(admin_stats.router)
 app.include_router(org.router)
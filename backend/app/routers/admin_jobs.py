@@ -0,0 +1,18 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core import jobs
+from app.core.authz import AuthContext, require_system_admin
+from app.core.supabase import get_service_client
+from app.schemas import JobResponse
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    job = await jobs.get_job(await get_service_client(), job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
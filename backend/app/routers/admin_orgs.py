@@ -1,87 +1,102 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Optional
 
-import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from postgrest.exceptions import APIError
 
+from app.core import job_handlers  # noqa: F401  (registers job kinds)
+from app.core import jobs, queries
+from app.core.authz import AuthContext, invalidate_user, require_system_admin
 from app.core.config import settings
-from app.core.security import AuthedUser, verify_jwt
+from app.core.export import ExportFormat, export_response
+from app.core.http_cache import REVALIDATE, conditional, etag_for
+from app.core.member_import import import_members, open_records
+from app.core.module_flags import module_flags
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
+from app.core.responses import MEMBER_LIST, MODULE_FLAG_LIST, ORG_LIST, ORG_MODULE_FLAG_LIST, fast_list
 from app.core.supabase import get_service_client
+from app.core.users import get_user_id_by_email
 from app.schemas import (
+    BulkModulesPatchRequest,
+    JobResponse,
     MemberAddRequest,
     MemberResponse,
     MemberUpdateRequest,
     ModuleFlag,
+    ModulesPatchItem,
     ModulesPatchRequest,
+    ModuleRolloutRequest,
     OrgCreateRequest,
+    OrgModuleFlag,
     OrgResponse,
+    OrgRole,
+    OrgStatus,
     OrgUpdateRequest,
 )
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
-def _require_system_admin(user: AuthedUser) -> None:
-    try:
-        sb = get_service_client()
-    except RuntimeError as e:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
-    sa = sb.table("system_admins").select("user_id").eq("user_id", user.user_id).execute()
-    if not sa.data:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="System admin required")
-
-
-def _get_user_id_by_email(email: str) -> str | None:
-    url = f"{settings.supabase_url}/auth/v1/admin/users"
-    headers = {
-        "apikey": settings.supabase_service_role_key,
-        "authorization": f"Bearer {settings.supabase_service_role_key}",
-    }
-    params = {"email": email}
-    with httpx.Client(timeout=15.0) as client:
-        r = client.get(url, headers=headers, params=params)
-        if r.status_code >= 400:
-            return None
-        data = r.json()
-        users = data.get("users") if isinstance(data, dict) else None
-        if not users:
-            return None
-        u = users[0]
-        return u.get("id")
-
-
 @router.post("/orgs", response_model=OrgResponse)
-def create_org(payload: OrgCreateRequest, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
+async def create_org(payload: OrgCreateRequest, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    sb = await get_service_client()
 
-    created = sb.table("organizations").insert({"name": payload.name}).execute()
+    created = await sb.table("organizations").insert({"name": payload.name}).execute()
     if not created.data:
         raise HTTPException(status_code=500, detail="Failed to create org")
     org = created.data[0]
 
-    # Defense-in-depth: API seeds core; DB trigger also seeds.
-    sb.table("org_modules").upsert(
-        {"org_id": org["id"], "module_key": "core", "is_enabled": True},
-        on_conflict="org_id,module_key",
-    ).execute()
+    # Defense-in-depth: the DB trigger seeds core; the API re-seeds it off the request path.
+    await jobs.runner.enqueue("seed_org", {"org_id": org["id"]}, created_by=ctx.user_id)
 
     return org
 
 
 @router.get("/orgs", response_model=list[OrgResponse])
-def list_orgs(user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
-    res = sb.table("organizations").select("*").order("created_at", desc=True).execute()
-    return res.data or []
+async def list_orgs(
+    response: Response,
+    status: Optional[OrgStatus] = None,
+    name_prefix: Optional[str] = Query(default=None, min_length=1, max_length=200),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ctx: AuthContext = Depends(require_system_admin),
+) -> Any:
+    sb = await get_service_client()
+    rows, next_cursor = await queries.org_page(sb, status=status, name_prefix=name_prefix, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return fast_list(ORG_LIST, rows, response)
+
+
+@router.get("/orgs/export")
+async def export_orgs(
+    status: Optional[OrgStatus] = None,
+    name_prefix: Optional[str] = Query(default=None, min_length=1, max_length=200),
+    fmt: ExportFormat = Query(default="ndjson", alias="format"),
+    gzip: bool = False,
+    ctx: AuthContext = Depends(require_system_admin),
+) -> Any:
+    sb = await get_service_client()
+
+    def page(cursor: Optional[str]):
+        return queries.org_page(sb, status=status, name_prefix=name_prefix, limit=settings.export_page_size, cursor=cursor)
+
+    return export_response(page, queries.ORG_COLUMNS, fmt, "organizations", gzip)
+
+
+@router.get("/orgs/{org_id}", response_model=OrgResponse)
+async def get_org(org_id: str, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    sb = await get_service_client()
+    res = await sb.table("organizations").select(queries.ORG_COLUMNS).eq("id", org_id).limit(1).execute()
+    if not res.data:
+        raise HTTPException(status_code=404, detail="Org not found")
+    return res.data[0]
 
 
 @router.patch("/orgs/{org_id}", response_model=OrgResponse)
-def update_org(org_id: str, payload: OrgUpdateRequest, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
+async def update_org(org_id: str, payload: OrgUpdateRequest, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    sb = await get_service_client()
 
     patch: dict[str, Any] = {}
     if payload.name is not None:
@@ -89,45 +104,88 @@ def update_org(org_id: str, payload: OrgUpdateRequest, user: AuthedUser = Depend
     if payload.status is not None:
         patch["status"] = payload.status
     if not patch:
-        cur = sb.table("organizations").select("*").eq("id", org_id).single().execute()
+        cur = await sb.table("organizations").select(queries.ORG_COLUMNS).eq("id", org_id).single().execute()
         return cur.data
 
-    res = sb.table("organizations").update(patch).eq("id", org_id).execute()
+    res = await sb.table("organizations").update(patch).eq("id", org_id).execute()
     if not res.data:
         raise HTTPException(status_code=404, detail="Org not found")
     return res.data[0]
 
 
 @router.get("/orgs/{org_id}/members", response_model=list[MemberResponse])
-def list_members(org_id: str, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
-    res = sb.table("org_members").select("*").eq("org_id", org_id).order("created_at", desc=False).execute()
-    return res.data or []
+async def list_members(
+    org_id: str,
+    response: Response,
+    role: Optional[OrgRole] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ctx: AuthContext = Depends(require_system_admin),
+) -> Any:
+    sb = await get_service_client()
+    rows, next_cursor = await queries.member_page(sb, org_id, role=role, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return fast_list(MEMBER_LIST, rows, response)
+
+
+@router.get("/orgs/{org_id}/members/export")
+async def export_members(
+    org_id: str,
+    role: Optional[OrgRole] = None,
+    fmt: ExportFormat = Query(default="ndjson", alias="format"),
+    gzip: bool = False,
+    ctx: AuthContext = Depends(require_system_admin),
+) -> Any:
+    sb = await get_service_client()
+
+    def page(cursor: Optional[str]):
+        return queries.member_page(sb, org_id, role=role, limit=settings.export_page_size, cursor=cursor)
+
+    return export_response(page, queries.MEMBER_COLUMNS, fmt, f"members-{org_id}", gzip)
 
 
 @router.post("/orgs/{org_id}/members", response_model=MemberResponse)
-def add_member(org_id: str, payload: MemberAddRequest, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
+async def add_member(org_id: str, payload: MemberAddRequest, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    sb = await get_service_client()
 
     uid = payload.user_id
     if not uid and payload.email:
-        uid = _get_user_id_by_email(payload.email)
+        uid = await get_user_id_by_email(payload.email)
     if not uid:
         raise HTTPException(status_code=400, detail="Provide user_id or existing user email")
 
-    res = sb.table("org_members").insert({"org_id": org_id, "user_id": uid, "role": payload.role}).execute()
+    res = await sb.table("org_members").insert({"org_id": org_id, "user_id": uid, "role": payload.role}).execute()
     if not res.data:
         raise HTTPException(status_code=400, detail="Failed to add member (maybe already exists)")
+    await invalidate_user(uid)
     return res.data[0]
 
 
+@router.post("/orgs/{org_id}/members/bulk")
+async def bulk_add_members(
+    org_id: str, request: Request, background: bool = False, ctx: AuthContext = Depends(require_system_admin)
+) -> Any:
+    """Add many members at once. Unlike POST /orgs/{org_id}/members, which rejects an existing member
+    with 400, this upserts: a user who is already a member gets the row's role."""
+    # Body: JSON array, NDJSON or CSV (header row) of MemberAddRequest; streams one NDJSON result per row,
+    # or with ?background=true returns a job (GET /admin/jobs/{id}) at once.
+    sb = await get_service_client()
+    records = await open_records(request)
+    if background:
+        rows = []
+        async for rec in records:
+            rows.append(rec)
+            if len(rows) > settings.bulk_import_max_rows:
+                break
+        job = await jobs.runner.enqueue("member_import", {"org_id": org_id, "rows": rows}, created_by=ctx.user_id)
+        return JSONResponse(job, status_code=202)
+    return StreamingResponse(import_members(sb, org_id, records), media_type="application/x-ndjson")
+
+
 @router.patch("/orgs/{org_id}/members/{member_id}", response_model=MemberResponse)
-def update_member(org_id: str, member_id: str, payload: MemberUpdateRequest, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
-    res = (
+async def update_member(org_id: str, member_id: str, payload: MemberUpdateRequest, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    sb = await get_service_client()
+    res = await (
         sb.table("org_members")
         .update({"role": payload.role})
         .eq("id", member_id)
@@ -136,47 +194,66 @@ def update_member(org_id: str, member_id: str, payload: MemberUpdateRequest, use
     )
     if not res.data:
         raise HTTPException(status_code=404, detail="Member not found")
+    await invalidate_user(res.data[0]["user_id"])
     return res.data[0]
 
 
 @router.delete("/orgs/{org_id}/members/{member_id}")
-def remove_member(org_id: str, member_id: str, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
-    res = sb.table("org_members").delete().eq("id", member_id).eq("org_id", org_id).execute()
+async def remove_member(org_id: str, member_id: str, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    sb = await get_service_client()
+    res = await sb.table("org_members").delete().eq("id", member_id).eq("org_id", org_id).execute()
     if not res.data:
         raise HTTPException(status_code=404, detail="Member not found")
+    await invalidate_user(res.data[0]["user_id"])
     return {"ok": True}
 
 
 @router.get("/orgs/{org_id}/modules", response_model=list[ModuleFlag])
-def get_org_modules(org_id: str, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
-
-    mods = sb.table("modules").select("key,name").order("key", desc=False).execute().data or []
-    flags = sb.table("org_modules").select("module_key,is_enabled").eq("org_id", org_id).execute().data or []
-    flag_map = {f["module_key"]: bool(f["is_enabled"]) for f in flags}
+async def get_org_modules(org_id: str, request: Request, response: Response, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    flags = await module_flags.flags(await get_service_client(), org_id)
+    not_modified = conditional(request, response, etag_for(org_id, flags), REVALIDATE)
+    if not_modified is not None:
+        return not_modified
+    return fast_list(MODULE_FLAG_LIST, flags, response)
 
-    out = []
-    for m in mods:
-        k = m["key"]
-        out.append({"key": k, "name": m["name"], "is_enabled": True if k == "core" else flag_map.get(k, False)})
-    return out
 
-
-@router.patch("/orgs/{org_id}/modules", response_model=list[ModuleFlag])
-def patch_org_modules(org_id: str, payload: ModulesPatchRequest, user: AuthedUser = Depends(verify_jwt)) -> Any:
-    _require_system_admin(user)
-    sb = get_service_client()
-
-    rows = []
-    for u in payload.updates:
+def _flag_updates(items: list[ModulesPatchItem]) -> dict[str, bool]:
+    updates = {}
+    for u in items:
         if u.module_key == "core" and not u.is_enabled:
             raise HTTPException(status_code=400, detail="core is locked ON")
-        rows.append({"org_id": org_id, "module_key": u.module_key, "is_enabled": True if u.module_key == "core" else u.is_enabled})
+        updates[u.module_key] = u.is_enabled
+    return updates
 
-    if rows:
-        sb.table("org_modules").upsert(rows, on_conflict="org_id,module_key").execute()
 
-    return get_org_modules(org_id, user)
+@router.patch("/orgs/{org_id}/modules", response_model=list[ModuleFlag])
+async def patch_org_modules(org_id: str, payload: ModulesPatchRequest, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    updates = _flag_updates(payload.updates)
+    sb = await get_service_client()
+    if updates:
+        await module_flags.set_flags(sb, [org_id], updates)
+    # No read-back if set_flags left a current snapshot (always with MODULE_FLAGS_USE_RPC, otherwise only
+    # if the org was cached); an uncached org after the plain upsert costs one org_modules read.
+    return await module_flags.flags(sb, org_id)
+
+
+@router.post("/modules/rollout", response_model=JobResponse, status_code=202)
+async def rollout_modules(payload: ModuleRolloutRequest, ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    # Background variant of PATCH /admin/modules for large or all-org rollouts.
+    updates = _flag_updates(payload.updates)
+    org_ids = list(dict.fromkeys(payload.org_ids)) if payload.org_ids is not None else None
+    return await jobs.runner.enqueue("module_rollout", {"org_ids": org_ids, "updates": updates}, created_by=ctx.user_id)
+
+
+@router.patch("/modules", response_model=list[OrgModuleFlag])
+async def bulk_patch_modules(
+    payload: BulkModulesPatchRequest, response: Response, ctx: AuthContext = Depends(require_system_admin)
+) -> Any:
+    # Roll module flags out to (or back from) many orgs in a single upsert.
+    updates = _flag_updates(payload.updates)
+    sb = await get_service_client()
+    try:
+        rows = await module_flags.set_flags(sb, list(dict.fromkeys(payload.org_ids)), updates)
+    except APIError as e:
+        raise HTTPException(status_code=400, detail=e.message or "Failed to update modules") from e
+    return fast_list(ORG_MODULE_FLAG_LIST, rows, response)
@@ -0,0 +1,22 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.core.authz import AuthContext, require_system_admin
+from app.core.cache import cache_stats
+from app.core.rate_limit import limiter
+from app.core.supabase import pool_stats
+from app.core.upstream import breaker_stats
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/stats")
+def get_stats(ctx: AuthContext = Depends(require_system_admin)) -> Any:
+    # Per-process internals; kept off the unauthenticated /healthz probe.
+    return {
+        "supabase_pool": pool_stats(),
+        "upstream": breaker_stats(),
+        "rate_limit": limiter.stats(),
+        "caches": cache_stats(),
+    }
@@ -1,36 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any
 
-from app.core.security import AuthedUser, verify_jwt
-from app.core.supabase import get_service_client
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.core.authz import AuthContext, get_auth_context
+from app.core.http_cache import REVALIDATE, conditional, etag_for
 from app.schemas import MeMembership, MeResponse
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=MeResponse)
-def me(user: AuthedUser = Depends(verify_jwt)) -> MeResponse:
-    try:
-        sb = get_service_client()
-    except RuntimeError as e:
-        raise HTTPException(status_code=503, detail=str(e)) from e
-
-    sa = sb.table("system_admins").select("user_id").eq("user_id", user.user_id).execute()
-    is_system_admin = bool(sa.data)
-
-    mem = (
-        sb.table("org_members")
-        .select("org_id,role,created_at")
-        .eq("user_id", user.user_id)
-        .order("created_at", desc=False)
-        .execute()
-    )
+async def me(request: Request, response: Response, ctx: AuthContext = Depends(get_auth_context)) -> Any:
+    is_system_admin, mems = await ctx.load()
+    not_modified = conditional(request, response, etag_for(ctx.user_id, ctx.user.email, is_system_admin, mems), REVALIDATE)
+    if not_modified is not None:
+        return not_modified
 
-    memberships = [MeMembership(org_id=r["org_id"], role=r["role"]) for r in (mem.data or [])]
+    memberships = [MeMembership(org_id=m.org_id, role=m.role) for m in mems]
     default_org_id = memberships[0].org_id if memberships else None
 
     return MeResponse(
-        user_id=user.user_id,
-        email=user.email,
+        user_id=ctx.user_id,
+        email=ctx.user.email,
         is_system_admin=is_system_admin,
         memberships=memberships,
         default_org_id=default_org_id,
@@ -1,75 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
 
-from app.core.security import AuthedUser, verify_jwt
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.core import queries
+from app.core.authz import AuthContext, get_auth_context
+from app.core.http_cache import conditional, etag_for, short_lived
+from app.core.module_flags import module_flags
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
+from app.core.responses import MEMBER_LIST, MODULE_FLAG_LIST, fast_list
 from app.core.supabase import get_service_client
+from app.schemas import OrgRole
 
 router = APIRouter(prefix="/org", tags=["org"])
 
 
-def _default_org_id(user_id: str) -> str | None:
-    try:
-        sb = get_service_client()
-    except RuntimeError:
-        return None
-    mem = (
-        sb.table("org_members")
-        .select("org_id,role,created_at")
-        .eq("user_id", user_id)
-        .order("created_at", desc=False)
-        .execute()
-    )
-    if not mem.data:
-        return None
-    return mem.data[0]["org_id"]
-
-
-def _role_for_org(user_id: str, org_id: str) -> str | None:
-    try:
-        sb = get_service_client()
-    except RuntimeError:
-        return None
-    mem = (
-        sb.table("org_members")
-        .select("role")
-        .eq("user_id", user_id)
-        .eq("org_id", org_id)
-        .limit(1)
-        .execute()
-    )
-    if not mem.data:
-        return None
-    return mem.data[0]["role"]
-
-
 @router.get("/modules")
-def current_org_modules(user: AuthedUser = Depends(verify_jwt)):
-    try:
-        sb = get_service_client()
-    except RuntimeError as e:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
-    org_id = _default_org_id(user.user_id)
-    if not org_id:
-        return []
-
-    mods = sb.table("modules").select("key,name").order("key", desc=False).execute().data or []
-    flags = sb.table("org_modules").select("module_key,is_enabled").eq("org_id", org_id).execute().data or []
-    flag_map = {f["module_key"]: bool(f["is_enabled"]) for f in flags}
-    return [{"key": m["key"], "name": m["name"], "is_enabled": True if m["key"] == "core" else flag_map.get(m["key"], False)} for m in mods]
+async def current_org_modules(request: Request, response: Response, ctx: AuthContext = Depends(get_auth_context)):
+    flags = await module_flags.flags_for_user(await get_service_client(), ctx)
+    # Polled on every page load; a short max-age lets the browser skip most polls outright.
+    not_modified = conditional(request, response, etag_for(ctx.user_id, flags), short_lived(10))
+    if not_modified is not None:
+        return not_modified
+    return fast_list(MODULE_FLAG_LIST, flags, response)
 
 
 @router.get("/members")
-def list_org_members(user: AuthedUser = Depends(verify_jwt)):
-    try:
-        sb = get_service_client()
-    except RuntimeError as e:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
-    org_id = _default_org_id(user.user_id)
+async def list_org_members(
+    response: Response,
+    role: Optional[OrgRole] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ctx: AuthContext = Depends(get_auth_context),
+):
+    org_id = await ctx.org_id()
     if not org_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No org membership")
-
-    role = _role_for_org(user.user_id, org_id)
-    if role != "org_admin":
+    if await ctx.role_for(org_id) != "org_admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="org_admin required")
 
-    res = sb.table("org_members").select("*").eq("org_id", org_id).order("created_at", desc=False).execute()
-    return res.data or []
+    rows, next_cursor = await queries.member_page(await get_service_client(), org_id, role=role, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return fast_list(MEMBER_LIST, rows, response)
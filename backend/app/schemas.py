@@ -69,3 +69,36 @@ class ModulesPatchItem(BaseModel):
 class ModulesPatchRequest(BaseModel):
     updates: list[ModulesPatchItem]
 
+
+class BulkModulesPatchRequest(BaseModel):
+    org_ids: list[str] = Field(min_length=1, max_length=10000)
+    updates: list[ModulesPatchItem] = Field(min_length=1)
+
+
+class ModuleRolloutRequest(BaseModel):
+    # None rolls out to every org.
+    org_ids: Optional[list[str]] = None
+    updates: list[ModulesPatchItem] = Field(min_length=1)
+
+
+class OrgModuleFlag(BaseModel):
+    org_id: str
+    module_key: ModuleKey
+    is_enabled: bool
+
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    progress: int
+    total: Optional[int] = None
+    attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
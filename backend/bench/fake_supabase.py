@@ -0,0 +1,337 @@
+"""In-memory stand-in for the Supabase REST (PostgREST) and Auth APIs used by the backend.
+
+Only the subset of PostgREST the routers use is implemented: column projection, the
+eq/neq/gt/gte/lt/lte/in/like/ilike/is filters, order, limit/offset, insert/upsert/update/delete
+with return=representation, and single-object responses. Every request sleeps `latency_ms`
+to model the network hop to a hosted project.
+"""
+
+import asyncio
+import itertools
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request, Response
+
+MODULES = ["core", "flow", "docs", "assets", "vibe", "grow", "vision", "insights"]
+
+# Column defaults from 0001_foundations.sql that the API relies on.
+DEFAULTS = {
+    "organizations": {"status": "active"},
+    "org_modules": {"is_enabled": False},
+    "jobs": {"status": "queued", "progress": 0, "total": None, "attempts": 0, "result": None, "error": None, "started_at": None, "finished_at": None, "heartbeat_at": None},
+}
+
+ADMIN_USER_ID = "00000000-0000-0000-0000-00000000a001"
+MEMBER_USER_ID = "00000000-0000-0000-0000-00000000b001"
+
+
+@dataclass
+class FakeState:
+    latency_ms: float = 0.0
+    tables: dict[str, list[dict]] = field(default_factory=dict)
+    calls: int = 0
+
+    def seed(self, orgs: int = 20, members_per_org: int = 50) -> "FakeState":
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        tick = itertools.count()
+
+        def ts() -> str:
+            return (base + timedelta(seconds=next(tick))).isoformat()
+
+        self.tables = {
+            "modules": [{"key": k, "name": k.title(), "created_at": ts()} for k in MODULES],
+            "system_admins": [{"user_id": ADMIN_USER_ID, "created_at": ts()}],
+            "organizations": [],
+            "org_members": [],
+            "org_modules": [],
+            "jobs": [],
+            "auth_user_lookup": [
+                {"user_id": ADMIN_USER_ID, "email": "a001@example.com"},
+                {"user_id": MEMBER_USER_ID, "email": "b001@example.com"},
+            ],
+        }
+        for i in range(orgs):
+            org_id = str(uuid.UUID(int=i + 1))
+            self.tables["organizations"].append({"id": org_id, "name": f"Org {i:05d}", "status": "active", "created_at": ts()})
+            for k in MODULES[: 1 + i % len(MODULES)]:
+                self.tables["org_modules"].append(
+                    {"id": str(uuid.uuid4()), "org_id": org_id, "module_key": k, "is_enabled": True, "created_at": ts()}
+                )
+            members = [MEMBER_USER_ID] + [str(uuid.UUID(int=(i + 1) << 32 | j)) for j in range(1, members_per_org)]
+            for j, uid in enumerate(members):
+                role = "org_admin" if j == 0 else ("hr", "manager", "employee")[j % 3]
+                self.tables["org_members"].append(
+                    {"id": str(uuid.uuid5(uuid.NAMESPACE_OID, f"{org_id}:{uid}")), "org_id": org_id, "user_id": uid, "role": role, "created_at": ts()}
+                )
+        return self
+
+
+def _coerce(value: str):
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    if value == "null":
+        return None
+    return value
+
+
+def _matches(row: dict, col: str, expr: str) -> bool:
+    op, _, raw = expr.partition(".")
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1].replace('\\"', '"')
+    v = row.get(col)
+    if op == "eq":
+        return str(v).lower() == raw.lower() if isinstance(v, bool) else v == _coerce(raw)
+    if op == "neq":
+        return v != _coerce(raw)
+    if op in ("gt", "gte", "lt", "lte"):
+        if v is None:
+            return False
+        return {"gt": v > raw, "gte": v >= raw, "lt": v < raw, "lte": v <= raw}[op]
+    if op == "in":
+        vals = [x.strip().strip('"') for x in raw.strip("()").split(",")]
+        return str(v) in vals
+    if op in ("like", "ilike"):
+        pat = raw.replace("*", "%")
+        a, b = (str(v), pat) if op == "like" else (str(v).lower(), pat.lower())
+        if b.endswith("%") and "%" not in b[:-1]:
+            return a.startswith(b[:-1])
+        return a == b
+    if op == "is":
+        return v is _coerce(raw)
+    return True
+
+
+def _split_top(s: str) -> list[str]:
+    out, depth, cur, quoted = [], 0, "", False
+    for ch in s:
+        if ch == '"':
+            quoted = not quoted
+        if quoted:
+            cur += ch
+            continue
+        if ch == "," and depth == 0:
+            out.append(cur)
+            cur = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        cur += ch
+    if cur:
+        out.append(cur)
+    return out
+
+
+def _logic(row: dict, op: str, body: str) -> bool:
+    results = []
+    for term in _split_top(body.strip("()")):
+        if term.startswith(("and(", "or(")):
+            name, _, rest = term.partition("(")
+            results.append(_logic(row, name, "(" + rest))
+        else:
+            col, _, expr = term.partition(".")
+            results.append(_matches(row, col, expr))
+    return all(results) if op == "and" else any(results)
+
+
+def _filter(rows: list[dict], params) -> list[dict]:
+    reserved = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+    out = rows
+    for key, expr in params.multi_items():
+        if key in reserved:
+            continue
+        if key in ("or", "and"):
+            out = [r for r in out if _logic(r, key, expr)]
+        else:
+            out = [r for r in out if _matches(r, key, expr)]
+    return out
+
+
+def _order(rows: list[dict], order: str | None) -> list[dict]:
+    if not order:
+        return rows
+    for part in reversed(order.split(",")):
+        col, _, direction = part.partition(".")
+        rows = sorted(rows, key=lambda r: (r.get(col) is None, r.get(col)), reverse=direction.startswith("desc"))
+    return rows
+
+
+def _project(rows: list[dict], select: str | None) -> list[dict]:
+    if not select or select == "*":
+        return [dict(r) for r in rows]
+    cols = [c.strip() for c in select.split(",")]
+    return [{c: r.get(c) for c in cols} for r in rows]
+
+
+def _set_org_modules(state: FakeState, args: dict) -> list[dict]:
+    flags = state.tables["org_modules"]
+    for org_id in args["_org_ids"]:
+        for key, enabled in args["_updates"].items():
+            row = next((r for r in flags if r["org_id"] == org_id and r["module_key"] == key), None)
+            if row is None:
+                row = {"id": str(uuid.uuid4()), "org_id": org_id, "module_key": key, "created_at": datetime.now(timezone.utc).isoformat()}
+                flags.append(row)
+            row["is_enabled"] = bool(enabled) or key == "core"
+    enabled_keys = {(r["org_id"], r["module_key"]) for r in flags if r["is_enabled"]}
+    return [
+        {"org_id": o, "key": m["key"], "name": m["name"], "is_enabled": (o, m["key"]) in enabled_keys or m["key"] == "core"}
+        for o in sorted(args["_org_ids"])
+        for m in sorted(state.tables["modules"], key=lambda m: m["key"])
+    ]
+
+
+def _memberships_of(state: FakeState, user_id: str) -> list[dict]:
+    return sorted((m for m in state.tables["org_members"] if m["user_id"] == user_id), key=lambda m: m["created_at"])
+
+
+def _get_me(state: FakeState, args: dict) -> dict:
+    uid = args["_user_id"]
+    mems = _memberships_of(state, uid)
+    return {
+        "user_id": uid,
+        "is_system_admin": any(a["user_id"] == uid for a in state.tables["system_admins"]),
+        "memberships": [{"org_id": m["org_id"], "role": m["role"]} for m in mems],
+        "default_org_id": mems[0]["org_id"] if mems else None,
+    }
+
+
+def _get_org_modules_for_user(state: FakeState, args: dict) -> dict:
+    mems = _memberships_of(state, args["_user_id"])
+    if not mems:
+        return {"org_id": None, "memberships": [], "modules": []}
+    org_id = mems[0]["org_id"]
+    on = {r["module_key"] for r in state.tables["org_modules"] if r["org_id"] == org_id and r["is_enabled"]}
+    modules = sorted(state.tables["modules"], key=lambda m: m["key"])
+    memberships = [{"org_id": m["org_id"], "role": m["role"]} for m in mems]
+    return {"org_id": org_id, "memberships": memberships, "modules": [{"key": m["key"], "name": m["name"], "is_enabled": m["key"] in on or m["key"] == "core"} for m in modules]}
+
+
+# Postgres functions from supabase/migrations, reimplemented over the in-memory tables.
+RPC = {"set_org_modules": _set_org_modules, "get_me": _get_me, "get_org_modules_for_user": _get_org_modules_for_user}
+
+
+def create_app(state: FakeState) -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def latency(request: Request, call_next):
+        state.calls += 1
+        if state.latency_ms:
+            await asyncio.sleep(state.latency_ms / 1000)
+        return await call_next(request)
+
+    def reply(request: Request, rows: list[dict]) -> Response:
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(rows) != 1:
+                return Response(json.dumps({"message": "JSON object requested, multiple (or no) rows returned"}), 406)
+            return Response(json.dumps(rows[0]), media_type="application/json")
+        return Response(json.dumps(rows), media_type="application/json")
+
+    @app.get("/rest/v1/{table}")
+    async def select(table: str, request: Request):
+        p = request.query_params
+        rows = _order(_filter(state.tables.get(table, []), p), p.get("order"))
+        offset = int(p.get("offset", 0))
+        if "limit" in p:
+            rows = rows[offset : offset + int(p["limit"])]
+        elif offset:
+            rows = rows[offset:]
+        return reply(request, _project(rows, p.get("select")))
+
+    @app.post("/rest/v1/{table}")
+    async def insert(table: str, request: Request):
+        body = await request.json()
+        rows = body if isinstance(body, list) else [body]
+        data = state.tables.setdefault(table, [])
+        conflict = [c for c in (request.query_params.get("on_conflict") or "").split(",") if c]
+        merge = "merge-duplicates" in request.headers.get("prefer", "")
+        out = []
+        for row in rows:
+            existing = None
+            if conflict:
+                existing = next((r for r in data if all(r.get(c) == row.get(c) for c in conflict)), None)
+            if existing is not None:
+                if not merge:
+                    return Response(json.dumps({"message": "duplicate key"}), 409)
+                existing.update(row)
+                out.append(dict(existing))
+                continue
+            new = {"id": str(uuid.uuid4()), "created_at": datetime.now(timezone.utc).isoformat(), **DEFAULTS.get(table, {}), **row}
+            data.append(new)
+            out.append(dict(new))
+            if table == "organizations":
+                # organizations_seed_core trigger
+                state.tables["org_modules"].append(
+                    {"id": str(uuid.uuid4()), "org_id": new["id"], "module_key": "core", "is_enabled": True, "created_at": new["created_at"]}
+                )
+        return reply(request, _project(out, request.query_params.get("select")))
+
+    @app.patch("/rest/v1/{table}")
+    async def update(table: str, request: Request):
+        patch = await request.json()
+        rows = _filter(state.tables.get(table, []), request.query_params)
+        for r in rows:
+            r.update(patch)
+        return reply(request, [dict(r) for r in rows])
+
+    @app.delete("/rest/v1/{table}")
+    async def delete(table: str, request: Request):
+        data = state.tables.get(table, [])
+        rows = _filter(data, request.query_params)
+        state.tables[table] = [r for r in data if r not in rows]
+        return reply(request, rows)
+
+    @app.post("/rest/v1/rpc/{fn}")
+    async def rpc(fn: str, request: Request):
+        handler = RPC.get(fn)
+        if handler is None:
+            return Response(json.dumps({"message": f"function {fn} does not exist"}), 404)
+        result = handler(state, await request.json())
+        if isinstance(result, list):
+            return reply(request, result)
+        return Response(json.dumps(result), media_type="application/json")
+
+    @app.get("/auth/v1/user")
+    async def auth_user(request: Request):
+        return {"id": MEMBER_USER_ID, "email": "member@example.com"}
+
+    @app.get("/auth/v1/admin/users")
+    async def admin_users(request: Request):
+        email = request.query_params.get("email") or ""
+        return {"users": [{"id": str(uuid.uuid5(uuid.NAMESPACE_URL, email.lower())), "email": email}]}
+
+    @app.get("/auth/v1/.well-known/jwks.json")
+    async def jwks():
+        return {"keys": []}
+
+    @app.get("/__bench/calls")
+    async def calls():
+        # Not counted as an upstream call.
+        state.calls -= 1
+        return {"calls": state.calls}
+
+    return app
+
+
+def main() -> None:
+    import argparse
+
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description="Serve the Supabase stand-in on a local port.")
+    ap.add_argument("--port", type=int, default=54321)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--orgs", type=int, default=20)
+    ap.add_argument("--members", type=int, default=50, help="members per org")
+    args = ap.parse_args()
+
+    state = FakeState(latency_ms=args.latency_ms).seed(orgs=args.orgs, members_per_org=args.members)
+    uvicorn.run(create_app(state), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
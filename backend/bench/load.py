@@ -0,0 +1,298 @@
+"""Drive the FastAPI app at fixed concurrency against the local Supabase stand-in.
+
+    cd backend
+    python -m bench.load --concurrency 64 --requests 2000 --latency-ms 20
+    python -m bench.load --baseline bench/baselines/default.json      # compare, exit 1 on regression
+    python -m bench.load --save-baseline bench/baselines/default.json # refresh the committed baseline
+
+The stand-in runs as a separate uvicorn process on a loopback port (real sockets, real
+connection pool); the app is driven in-process through httpx's ASGI transport with its
+lifespan running. Each route runs warm (after a warm-up round, at --concurrency) and then cold:
+--cold-requests sequential requests with every app cache emptied before each one, reported as
+"<route> [cold]".
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from jose import jwt
+
+from bench.fake_supabase import ADMIN_USER_ID, MEMBER_USER_ID, FakeState
+
+JWT_SECRET = "bench-secret"
+# supabase-py rejects keys that do not look like a JWT.
+SERVICE_KEY = "bench.service.key"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake(args) -> tuple[str, subprocess.Popen]:
+    port = _free_port()
+    cmd = [sys.executable, "-m", "bench.fake_supabase", "--port", str(port), "--latency-ms", str(args.latency_ms)]
+    cmd += ["--orgs", str(args.orgs), "--members", str(args.members)]
+    proc = subprocess.Popen(cmd)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(500):
+        try:
+            httpx.get(f"{base_url}/__bench/calls")
+            return base_url, proc
+        except httpx.TransportError:
+            time.sleep(0.02)
+    proc.kill()
+    raise RuntimeError("Supabase stand-in did not start")
+
+
+async def upstream_calls(base_url: str) -> int:
+    async with httpx.AsyncClient() as c:
+        return (await c.get(f"{base_url}/__bench/calls")).json()["calls"]
+
+
+def token_for(user_id: str) -> str:
+    claims = {"sub": user_id, "email": f"{user_id[-4:]}@example.com", "aud": "authenticated", "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, JWT_SECRET, algorithm="HS256")
+
+
+def percentile(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def drain_jobs(base_url: str) -> int:
+    """Wait until no job is queued or running; returns the upstream calls the polling made."""
+    polls = 0
+    async with httpx.AsyncClient() as c:
+        while True:
+            polls += 1
+            r = await c.get(f"{base_url}/rest/v1/jobs", params={"select": "id", "status": "in.(queued,running)"})
+            if not r.json():
+                return polls
+            await asyncio.sleep(0.05)
+
+
+def routes_for(state: FakeState) -> list[dict]:
+    """Every API route, as the user the frontend would call it with.
+
+    Writes are idempotent or undone: `json` may be a function (a fresh body per request), `undo`
+    maps the response to a request that reverts it (sent and timed with it), `status` is the
+    expected status (default 200), and `jobs` routes wait for the jobs they enqueue to finish
+    before upstream calls are counted. Routes that create orgs come last.
+    """
+    org_id = state.tables["organizations"][0]["id"]
+    org_ids = [o["id"] for o in state.tables["organizations"]]
+    emails = [{"email": f"bench-import-{i}@example.com", "role": "employee"} for i in range(20)]
+    member_id = next(m["id"] for m in state.tables["org_members"] if m["org_id"] == org_id and m["role"] != "org_admin")
+    member, admin = MEMBER_USER_ID, ADMIN_USER_ID
+    return [
+        {"name": "GET /me", "method": "GET", "path": "/me", "user": member},
+        {"name": "GET /org/modules", "method": "GET", "path": "/org/modules", "user": member},
+        {"name": "GET /org/members", "method": "GET", "path": "/org/members", "user": member},
+        {"name": "GET /admin/orgs", "method": "GET", "path": "/admin/orgs", "user": admin},
+        {"name": "GET /admin/orgs?name_prefix", "method": "GET", "path": "/admin/orgs?name_prefix=Org%200001", "user": admin},
+        {"name": "PATCH /admin/orgs/{id}", "method": "PATCH", "path": f"/admin/orgs/{org_id}", "user": admin, "json": {"status": "active"}},
+        {"name": "GET /admin/orgs/export?format=ndjson", "method": "GET", "path": "/admin/orgs/export?format=ndjson", "user": admin},
+        {"name": "GET /admin/orgs/export?format=csv", "method": "GET", "path": "/admin/orgs/export?format=csv", "user": admin},
+        {"name": "GET /admin/orgs/{id}", "method": "GET", "path": f"/admin/orgs/{org_id}", "user": admin},
+        {"name": "GET /admin/orgs/{id}/members", "method": "GET", "path": f"/admin/orgs/{org_id}/members", "user": admin},
+        {
+            "name": "GET /admin/orgs/{id}/members/export",
+            "method": "GET",
+            "path": f"/admin/orgs/{org_id}/members/export?format=csv",
+            "user": admin,
+        },
+        {
+            "name": "POST+DELETE /admin/orgs/{id}/members",
+            "method": "POST",
+            "path": f"/admin/orgs/{org_id}/members",
+            "user": admin,
+            "json": lambda: {"user_id": str(uuid.uuid4()), "role": "employee"},
+            "undo": lambda body: ("DELETE", f"/admin/orgs/{org_id}/members/{body['id']}"),
+        },
+        {"name": "POST /admin/orgs/{id}/members/bulk", "method": "POST", "path": f"/admin/orgs/{org_id}/members/bulk", "user": admin, "json": emails},
+        {
+            "name": "PATCH /admin/orgs/{id}/members/{mid}",
+            "method": "PATCH",
+            "path": f"/admin/orgs/{org_id}/members/{member_id}",
+            "user": admin,
+            "json": {"role": "manager"},
+        },
+        {"name": "GET /admin/orgs/{id}/modules", "method": "GET", "path": f"/admin/orgs/{org_id}/modules", "user": admin},
+        {
+            "name": "PATCH /admin/orgs/{id}/modules",
+            "method": "PATCH",
+            "path": f"/admin/orgs/{org_id}/modules",
+            "user": admin,
+            "json": {"updates": [{"module_key": "flow", "is_enabled": True}]},
+        },
+        {
+            "name": "PATCH /admin/modules",
+            "method": "PATCH",
+            "path": "/admin/modules",
+            "user": admin,
+            "json": {"org_ids": org_ids, "updates": [{"module_key": "flow", "is_enabled": True}]},
+        },
+        {
+            "name": "POST /admin/modules/rollout",
+            "method": "POST",
+            "path": "/admin/modules/rollout",
+            "user": admin,
+            "json": {"org_ids": org_ids, "updates": [{"module_key": "flow", "is_enabled": True}]},
+            "status": 202,
+            "jobs": True,
+        },
+        {"name": "POST /admin/orgs", "method": "POST", "path": "/admin/orgs", "user": admin, "json": {"name": "Bench org"}, "jobs": True},
+    ]
+
+
+async def run_route(client: httpx.AsyncClient, base_url: str, route: dict, total: int, concurrency: int, cold: bool = False) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+    headers = {"authorization": f"Bearer {token_for(route['user'])}"}
+    expected = route.get("status", 200)
+    from app.core.cache import clear_caches
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            if cold:
+                await clear_caches()
+            body = route.get("json")
+            t0 = time.perf_counter()
+            r = await client.request(route["method"], route["path"], headers=headers, json=body() if callable(body) else body)
+            ok = r.status_code == expected
+            if ok and "undo" in route:
+                method, path = route["undo"](r.json())
+                ok = (await client.request(method, path, headers=headers)).status_code == 200
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if not ok:
+                errors += 1
+
+    calls_before = await upstream_calls(base_url)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    polls = await drain_jobs(base_url) if route.get("jobs") else 0
+    return {
+        "route": f"{route['name']} [cold]" if cold else route["name"],
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "upstream_calls_per_request": round((await upstream_calls(base_url) - calls_before - polls) / total, 2),
+    }
+
+
+async def main_async(args) -> list[dict]:
+    # Same seed as the stand-in process, used only to pick ids for the routes.
+    state = FakeState().seed(orgs=args.orgs, members_per_org=args.members)
+    base_url, proc = start_fake(args)
+
+    # Settings are read at import time, so configure the environment before importing the app.
+    # The job poller is parked so its periodic queries don't land in a route's upstream call count.
+    os.environ.update(SUPABASE_URL=base_url, SUPABASE_SERVICE_ROLE_KEY=SERVICE_KEY, SUPABASE_JWT_SECRET=JWT_SECRET, JOB_POLL_SECONDS="3600")
+    from app.main import app
+
+    routes = [r for r in routes_for(state) if not args.route or any(f in r["name"] for f in args.route)]
+    results = []
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+                for route in routes:
+                    await run_route(client, base_url, route, min(args.concurrency, args.requests), args.concurrency)
+                    results.append(await run_route(client, base_url, route, args.requests, args.concurrency))
+                    if args.cold_requests:
+                        results.append(await run_route(client, base_url, route, args.cold_requests, 1, cold=True))
+    finally:
+        proc.terminate()
+        proc.wait()
+    return results
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """Regressions against a saved baseline. Upstream calls per request are nearly deterministic and
+    may not grow by more than 10%; p95 latency may grow by `tolerance` (a fraction) before it counts.
+    """
+    base = {r["route"]: r for r in baseline["results"]}
+    problems = []
+    for r in results:
+        b = base.get(r["route"])
+        if b is None:
+            continue
+        if r["errors"]:
+            problems.append(f"{r['route']}: {r['errors']} unexpected responses")
+        if r["upstream_calls_per_request"] > b["upstream_calls_per_request"] * 1.1 + 0.01:
+            problems.append(
+                f"{r['route']}: upstream calls/request {b['upstream_calls_per_request']} -> {r['upstream_calls_per_request']}"
+            )
+        if r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            problems.append(f"{r['route']}: p95 {b['p95_ms']}ms -> {r['p95_ms']}ms")
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="simulated upstream latency per call")
+    ap.add_argument("--orgs", type=int, default=20)
+    ap.add_argument("--members", type=int, default=50, help="members per org")
+    ap.add_argument("--cold-requests", type=int, default=20, help="sequential cold-cache requests per route (0 to skip)")
+    ap.add_argument("--route", action="append", help="only routes whose name contains this (repeatable)")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    ap.add_argument("--baseline", help="compare against this baseline file; exit 1 on regression")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth vs the baseline")
+    ap.add_argument("--save-baseline", help="write results (and the run parameters) to this file")
+    args = ap.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'route':<48}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'calls/req':>11}{'err':>6}")
+        for r in results:
+            print(
+                f"{r['route']:<48}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+                f"{r['upstream_calls_per_request']:>11}{r['errors']:>6}"
+            )
+
+    if args.save_baseline:
+        params = {k: getattr(args, k) for k in ("concurrency", "requests", "latency_ms", "orgs", "members")}
+        meta = {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+        with open(args.save_baseline, "w") as f:
+            json.dump({"params": params, "environment": meta, "results": results}, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("params", {}).get("latency_ms") != args.latency_ms:
+            print("warning: baseline was recorded with a different --latency-ms", file=sys.stderr)
+        problems = compare(results, baseline, args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
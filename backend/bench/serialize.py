@@ -0,0 +1,83 @@
+"""Micro-benchmark: list response serialization paths (see app/core/responses.py).
+
+    cd backend
+    python -m bench.serialize --rows 500 --iterations 200
+
+"fastapi" is what a handler returning rows with response_model=list[...] costs today
+(serialize_response + JSONResponse.render); the others are the FAST_RESPONSES modes.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core import responses
+from app.schemas import MemberResponse
+
+
+def member_rows(n: int) -> list[dict]:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    org_id = str(uuid.uuid4())
+    roles = ("org_admin", "hr", "manager", "employee")
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "org_id": org_id,
+            "user_id": str(uuid.uuid4()),
+            "role": roles[i % 4],
+            "created_at": (base + timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+async def fastapi_path(field, rows: list[dict]) -> bytes:
+    content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+
+def timed(fn, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - t0) / iterations * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=500)
+    ap.add_argument("--iterations", type=int, default=200)
+    args = ap.parse_args()
+
+    rows = member_rows(args.rows)
+    field = create_model_field(name="Response_list_members", type_=list[MemberResponse], mode="serialization")
+    loop = asyncio.new_event_loop()
+    adapter = responses.MEMBER_LIST
+
+    paths = {
+        "fastapi": lambda: loop.run_until_complete(fastapi_path(field, rows)),
+        "validated": lambda: responses.render(adapter, rows, trusted=False),
+        "trusted": lambda: responses.render(adapter, rows, trusted=True),
+    }
+    reference = json.loads(paths["fastapi"]())
+    for name, fn in paths.items():
+        assert json.loads(fn()) == reference, name
+
+    print(f"{args.rows} member rows, {args.iterations} iterations (orjson: {'yes' if responses.orjson else 'no'})")
+    baseline = None
+    for name, fn in paths.items():
+        ms = timed(fn, args.iterations)
+        baseline = baseline or ms
+        print(f"{name:<10}{ms:>9.3f} ms/response{baseline / ms:>8.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
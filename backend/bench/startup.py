@@ -0,0 +1,151 @@
+"""Measure cold start: import time, time until the API is live and ready, and the first requests.
+
+    cd backend
+    python -m bench.startup --runs 5
+    python -m bench.startup --profile                                 # slowest imports (-X importtime)
+    python -m bench.startup --baseline bench/baselines/startup.json   # exit 1 on regression
+    python -m bench.startup --save-baseline bench/baselines/startup.json
+
+Each run starts a fresh `uvicorn app.main:app` process against the local Supabase stand-in (see
+bench.load) and polls it: "live" is the first 200 from /healthz, "ready" the first 200 from /readyz.
+The first request (GET /org/modules by default: catalog, flags and memberships) is sent as soon as
+the worker is ready; on loopback the stand-in's latency dominates, so TLS setup savings show only
+against a real project.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from bench.fake_supabase import MEMBER_USER_ID
+from bench.load import JWT_SECRET, SERVICE_KEY, _free_port, start_fake, token_for
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print((time.perf_counter() - t) * 1000)"
+METRICS = ("import_ms", "live_ms", "ready_ms", "first_request_ms", "second_request_ms")
+
+
+def import_ms(env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip())
+
+
+def profile_imports(env: dict, top: int) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) for the slowest imports under app.main."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], env=env, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def _wait_for(url: str, start: float, timeout: float = 30.0) -> float:
+    while time.perf_counter() - start < timeout:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return (time.perf_counter() - start) * 1000
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"{url} did not return 200 within {timeout}s")
+
+
+def one_run(env: dict, path: str) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env)
+    try:
+        live = _wait_for(f"{base}/healthz", start)
+        ready = _wait_for(f"{base}/readyz", start)
+        headers = {"authorization": f"Bearer {token_for(MEMBER_USER_ID)}"}
+        timings = []
+        with httpx.Client(base_url=base, headers=headers) as client:
+            for _ in range(2):
+                t = time.perf_counter()
+                client.get(path).raise_for_status()
+                timings.append((time.perf_counter() - t) * 1000)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"live_ms": live, "ready_ms": ready, "first_request_ms": timings[0], "second_request_ms": timings[1]}
+
+
+def summarize(runs: list[dict]) -> dict:
+    return {m: round(statistics.median(r[m] for r in runs), 1) for m in METRICS}
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    base = baseline["result"]
+    return [
+        f"{m}: {base[m]}ms -> {result[m]}ms"
+        for m in METRICS
+        if m in base and result[m] > base[m] * (1 + tolerance) + 5
+    ]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="simulated upstream latency per call")
+    ap.add_argument("--path", default="/org/modules", help="route for the first requests")
+    ap.add_argument("--profile", action="store_true", help="print the slowest imports and exit")
+    ap.add_argument("--top", type=int, default=25)
+    ap.add_argument("--json", action="store_true", help="print the result as JSON")
+    ap.add_argument("--baseline", help="compare against this baseline file; exit 1 on regression")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed growth vs the baseline")
+    ap.add_argument("--save-baseline", help="write the result (and the run parameters) to this file")
+    args = ap.parse_args()
+
+    base_url, fake = start_fake(SimpleNamespace(latency_ms=args.latency_ms, orgs=20, members=50))
+    env = {**os.environ, "SUPABASE_URL": base_url, "SUPABASE_SERVICE_ROLE_KEY": SERVICE_KEY, "SUPABASE_JWT_SECRET": JWT_SECRET}
+    try:
+        if args.profile:
+            for us, name in profile_imports(env, args.top):
+                print(f"{us / 1000:>9.1f}ms  {name}")
+            return
+        runs = []
+        for _ in range(args.runs):
+            run = one_run(env, args.path)
+            run["import_ms"] = import_ms(env)
+            runs.append(run)
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    result = summarize(runs)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for m in METRICS:
+            print(f"{m:<20}{result[m]:>9}")
+
+    if args.save_baseline:
+        params = {"runs": args.runs, "latency_ms": args.latency_ms, "path": args.path}
+        meta = {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+        with open(args.save_baseline, "w") as f:
+            json.dump({"params": params, "environment": meta, "result": result}, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+# Settings are read at import time; point them at test values before any app module loads.
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test-secret")
+os.environ.setdefault("SUPABASE_URL", "")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "")
@@ -0,0 +1,45 @@
+import asyncio
+
+from app.core import authz, queries
+from app.core.security import AuthedUser
+
+USER_ID = "00000000-0000-0000-0000-00000000b00c"
+
+
+def test_load_racing_an_invalidation_is_not_cached(monkeypatch):
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def memberships(sb, user_id):
+            started.set()
+            await release.wait()
+            return [{"org_id": "org-before-removal", "role": "org_admin"}]
+
+        async def is_system_admin(sb, user_id):
+            started.set()
+            await release.wait()
+            return True
+
+        monkeypatch.setattr(queries, "memberships", memberships)
+        monkeypatch.setattr(queries, "is_system_admin", is_system_admin)
+        await authz.invalidate_user(USER_ID)
+
+        ctx = authz.AuthContext(AuthedUser(user_id=USER_ID, email=None, claims={}), sb=None)
+        load = asyncio.ensure_future(asyncio.gather(ctx.memberships(), ctx.is_system_admin()))
+        await started.wait()
+        # The member is removed (and the admin flag revoked) while the old rows are in flight.
+        await authz.invalidate_user(USER_ID)
+        release.set()
+        mems, is_admin = await load
+
+        assert [m.org_id for m in mems] == ["org-before-removal"] and is_admin
+        assert await authz._membership_cache.get(USER_ID) is None
+        assert await authz._admin_cache.get(USER_ID) is None
+
+        # Without an invalidation in between, the load is cached as before.
+        ctx = authz.AuthContext(AuthedUser(user_id=USER_ID, email=None, claims={}), sb=None)
+        await ctx.memberships()
+        assert await authz._membership_cache.get(USER_ID) == [{"org_id": "org-before-removal", "role": "org_admin"}]
+        await authz.invalidate_user(USER_ID)
+
+    asyncio.run(scenario())
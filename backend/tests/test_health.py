@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from bench.fake_supabase import ADMIN_USER_ID, MEMBER_USER_ID
+from bench.load import JWT_SECRET, SERVICE_KEY, start_fake, token_for
+
+
+@pytest.fixture
+def client(monkeypatch):
+    base_url, proc = start_fake(SimpleNamespace(latency_ms=0, orgs=1, members=1))
+    monkeypatch.setattr(settings, "supabase_url", base_url)
+    monkeypatch.setattr(settings, "supabase_service_role_key", SERVICE_KEY)
+    monkeypatch.setattr(settings, "supabase_jwt_secret", JWT_SECRET)
+    from app.main import app
+
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def test_healthz_is_a_plain_liveness_probe(client):
+    r = client.get("/healthz")
+    assert r.status_code == 200
+    assert r.json() == {"ok": True}
+
+
+def test_stats_require_a_system_admin(client):
+    assert client.get("/admin/stats").status_code in (401, 403)
+    member = client.get("/admin/stats", headers={"authorization": f"Bearer {token_for(MEMBER_USER_ID)}"})
+    assert member.status_code == 403
+    admin = client.get("/admin/stats", headers={"authorization": f"Bearer {token_for(ADMIN_USER_ID)}"})
+    assert admin.status_code == 200
+    assert set(admin.json()) == {"supabase_pool", "upstream", "rate_limit", "caches"}
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import jobs
+from app.core.config import settings
+from app.core.supabase import close_service_client, get_service_client
+from bench.load import SERVICE_KEY, start_fake
+
+
+@jobs.handler("test_echo")
+async def echo(job: jobs.JobContext, payload: dict) -> dict:
+    return payload
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    base_url, proc = start_fake(SimpleNamespace(latency_ms=0, orgs=1, members=1))
+    monkeypatch.setattr(settings, "supabase_url", base_url)
+    monkeypatch.setattr(settings, "supabase_service_role_key", SERVICE_KEY)
+    monkeypatch.setattr(settings, "job_poll_seconds", 0.05)
+    monkeypatch.setattr(settings, "job_lease_seconds", 1.0)
+    monkeypatch.setattr(settings, "job_max_attempts", 3)
+    yield
+    proc.terminate()
+    proc.wait()
+
+
+def _ago(seconds: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+async def _wait_finished(sb, ids: list[str]) -> dict[str, dict]:
+    for _ in range(100):
+        rows = {r["id"]: r for r in (await sb.table("jobs").select("*").in_("id", ids).execute()).data}
+        if all(r["status"] in ("succeeded", "failed") for r in rows.values()):
+            return rows
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"jobs did not finish: {rows}")
+
+
+def test_runner_recovers_lost_and_unsubmitted_jobs(supabase):
+    async def scenario():
+        sb = await get_service_client()
+        runner = jobs.JobRunner()
+        try:
+            # Enqueued while this process has no running workers: only polling can pick it up.
+            queued = await runner.enqueue("test_echo", {"n": 1})
+            # Left running by a worker that died: one lost attempt, then retried.
+            lost = await sb.table("jobs").insert(
+                {"kind": "test_echo", "payload": {"n": 2}, "status": "running", "attempts": 0, "started_at": _ago(30), "heartbeat_at": _ago(30)}
+            ).execute()
+            # Lost with its last attempt: failed rather than retried forever.
+            spent = await sb.table("jobs").insert(
+                {"kind": "test_echo", "payload": {"n": 3}, "status": "running", "attempts": 2, "started_at": _ago(30), "heartbeat_at": _ago(30)}
+            ).execute()
+            # Running elsewhere with a fresh heartbeat: left alone.
+            alive = await sb.table("jobs").insert(
+                {"kind": "test_echo", "payload": {"n": 4}, "status": "running", "attempts": 0, "started_at": _ago(0), "heartbeat_at": _ago(0)}
+            ).execute()
+
+            await runner.start()
+            rows = await _wait_finished(sb, [queued["id"], lost.data[0]["id"], spent.data[0]["id"]])
+            alive_row = (await sb.table("jobs").select("*").eq("id", alive.data[0]["id"]).execute()).data[0]
+        finally:
+            await runner.stop()
+            await close_service_client()
+
+        assert rows[queued["id"]]["status"] == "succeeded"
+        assert rows[queued["id"]]["result"] == {"n": 1}
+        assert rows[lost.data[0]["id"]]["status"] == "succeeded"
+        assert rows[lost.data[0]["id"]]["attempts"] == 2
+        assert rows[spent.data[0]["id"]]["status"] == "failed"
+        assert "no heartbeat" in rows[spent.data[0]["id"]]["error"]
+        assert alive_row["status"] == "running"
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+import asyncio
+import uuid
+
+from app.core.member_import import _import_chunk
+
+ORG_ID = str(uuid.UUID(int=1))
+
+
+class RejectingTable:
+    """org_members stand-in: an upsert that includes a user in `bad` fails as a whole, like Postgres."""
+
+    def __init__(self, bad: set[str]):
+        self.bad = bad
+        self.calls = 0
+        self._rows: list[dict] = []
+
+    def upsert(self, rows, on_conflict=None):
+        self._rows = rows
+        return self
+
+    async def execute(self):
+        self.calls += 1
+        if any(r["user_id"] in self.bad for r in self._rows):
+            raise RuntimeError("insert or update on table violates foreign key constraint")
+        return type("Res", (), {"data": [{"id": f"m-{r['user_id']}", **r} for r in self._rows]})()
+
+
+class FakeClient:
+    def __init__(self, table: RejectingTable):
+        self._table = table
+
+    def table(self, name):
+        return self._table
+
+
+def test_bad_rows_do_not_fail_the_rest_of_the_chunk():
+    users = [str(uuid.UUID(int=100 + i)) for i in range(8)]
+    table = RejectingTable(bad={users[5]})
+    chunk = [(i + 1, {"user_id": u, "role": "employee"}) for i, u in enumerate(users)]
+    chunk.append((9, {"user_id": "not-a-uuid", "role": "employee"}))
+
+    results = asyncio.run(_import_chunk(FakeClient(table), ORG_ID, chunk))
+
+    by_row = {r["row"]: r for r in results}
+    assert by_row[9] == {"row": 9, "user_id": "not-a-uuid", "status": "error", "error": "user_id is not a UUID"}
+    assert by_row[6]["status"] == "error" and "foreign key" in by_row[6]["error"]
+    assert [by_row[n]["status"] for n in (1, 2, 3, 4, 5, 7, 8)] == ["ok"] * 7
+    # The whole chunk once, then halves down to the bad row: not one call per row.
+    assert table.calls < len(users)
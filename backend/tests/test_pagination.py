@@ -0,0 +1,48 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import _quote, decode_cursor, encode_cursor
+
+ROW = {"created_at": "2025-01-01T00:00:16.123456+00:00", "id": "00000000-0000-0000-0000-000000000003"}
+
+
+def _cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trips():
+    assert decode_cursor(encode_cursor(ROW)) == (ROW["created_at"], ROW["id"])
+    assert decode_cursor(encode_cursor({"created_at": "2025-01-01T00:00:16+00:00", "id": ROW["id"].upper()})) == (
+        "2025-01-01T00:00:16+00:00",
+        ROW["id"],
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _cursor({"created_at": ROW["created_at"]}),
+        _cursor([ROW["created_at"]]),
+        _cursor([123, ROW["id"]]),
+        _cursor([ROW["created_at"], 3]),
+        _cursor([ROW["created_at"], "3"]),
+        # Attempts to close the quoted value and add terms to the or=(...) filter.
+        _cursor([ROW["created_at"] + "\\", ROW["id"]]),
+        _cursor(['2025-01-01",id.neq.x,created_at.gt."2000-01-01', ROW["id"]]),
+        _cursor([ROW["created_at"], ROW["id"] + '"),org_id.neq.(x']),
+        _cursor(["yesterday", ROW["id"]]),
+    ],
+)
+def test_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+def test_quote_escapes_backslashes_and_quotes():
+    assert _quote('a"b') == '"a\\"b"'
+    assert _quote("a\\") == '"a\\\\"'
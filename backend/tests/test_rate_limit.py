@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core import authz, rate_limit
+from app.core.config import settings
+
+VICTIM_ORG = "00000000-0000-0000-0000-0000000000f1"
+ATTACKER_ORG = "00000000-0000-0000-0000-0000000000f2"
+MEMBER = "00000000-0000-0000-0000-00000000b001"
+ATTACKER = "00000000-0000-0000-0000-00000000c001"
+ADMIN = "00000000-0000-0000-0000-00000000a001"
+
+
+def token(user_id: str) -> dict:
+    claims = {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 3600}
+    return {"authorization": f"Bearer {jwt.encode(claims, settings.supabase_jwt_secret, algorithm='HS256')}"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_user_burst", 1000)
+    monkeypatch.setattr(settings, "rate_limit_user_per_second", 1000.0)
+    monkeypatch.setattr(settings, "rate_limit_org_burst", 3)
+    monkeypatch.setattr(settings, "rate_limit_org_per_second", 0.001)
+    monkeypatch.setattr(rate_limit, "limiter", rate_limit.RateLimiter())
+
+    async def seed():
+        await authz._membership_cache.set(MEMBER, [{"org_id": VICTIM_ORG, "role": "org_admin"}])
+        await authz._membership_cache.set(ATTACKER, [{"org_id": ATTACKER_ORG, "role": "employee"}])
+        await authz._admin_cache.set(ATTACKER, False)
+        await authz._admin_cache.set(ADMIN, True)
+
+    asyncio.run(seed())
+
+    app = FastAPI()
+
+    @app.get("/admin/orgs/{org_id}/members")
+    async def admin_members(org_id: str):
+        raise HTTPException(status_code=403, detail="System admin required")
+
+    @app.get("/org/members")
+    async def org_members():
+        return []
+
+    app.add_middleware(rate_limit.RateLimitMiddleware)
+    yield TestClient(app)
+    asyncio.run(authz.invalidate_user(MEMBER))
+    asyncio.run(authz.invalidate_user(ATTACKER))
+    asyncio.run(authz.invalidate_user(ADMIN))
+
+
+def test_foreign_org_in_path_is_not_charged(client):
+    # The attacker's requests count against their own org, which runs dry; the victim's doesn't.
+    statuses = [client.get(f"/admin/orgs/{VICTIM_ORG}/members", headers=token(ATTACKER)).status_code for _ in range(10)]
+    assert statuses[:3] == [403, 403, 403] and set(statuses[3:]) == {429}
+    assert client.get("/org/members", headers=token(MEMBER)).status_code == 200
+
+
+def test_foreign_org_header_is_not_charged(client):
+    for _ in range(10):
+        client.get("/org/members", headers={**token(ATTACKER), "X-Org-Id": VICTIM_ORG})
+    assert client.get("/org/members", headers=token(MEMBER)).status_code == 200
+
+
+def test_member_and_admin_are_charged_to_the_org(client, monkeypatch):
+    statuses = [client.get("/org/members", headers={**token(MEMBER), "X-Org-Id": VICTIM_ORG}).status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+
+    monkeypatch.setattr(rate_limit, "limiter", rate_limit.RateLimiter())
+    statuses = [client.get(f"/admin/orgs/{VICTIM_ORG}/members", headers=token(ADMIN)).status_code for _ in range(4)]
+    assert statuses == [403, 403, 403, 429]
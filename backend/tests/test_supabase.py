@@ -0,0 +1,30 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core import supabase
+from app.core.config import settings
+from bench.load import SERVICE_KEY, start_fake
+
+
+def test_pool_stats_count_opened_and_reused_connections(monkeypatch):
+    base_url, proc = start_fake(SimpleNamespace(latency_ms=0, orgs=1, members=1))
+    monkeypatch.setattr(settings, "supabase_url", base_url)
+    monkeypatch.setattr(settings, "supabase_service_role_key", SERVICE_KEY)
+    monkeypatch.setattr(supabase, "_stats", dict.fromkeys(supabase._stats, 0))
+
+    async def scenario():
+        try:
+            sb = await supabase.get_service_client()
+            for _ in range(5):
+                await sb.table("modules").select("key").execute()
+            return supabase.pool_stats()
+        finally:
+            await supabase.close_service_client()
+
+    try:
+        stats = asyncio.run(scenario())
+    finally:
+        proc.terminate()
+        proc.wait()
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
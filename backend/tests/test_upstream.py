@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import upstream
+from app.core.config import settings
+
+URL = "http://supabase.test/rest/v1/organizations"
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch):
+    monkeypatch.setattr(upstream, "_breakers", {})
+    monkeypatch.setattr(settings, "upstream_read_retries", 2)
+    monkeypatch.setattr(settings, "upstream_retry_base_seconds", 0.0)
+    monkeypatch.setattr(settings, "upstream_deadline_seconds", 5.0)
+    monkeypatch.setattr(settings, "upstream_coalesce_gets", True)
+    monkeypatch.setattr(settings, "circuit_failure_threshold", 3)
+    monkeypatch.setattr(settings, "circuit_open_seconds", 0.2)
+
+
+class Upstream:
+    """Inner transport double: answers with `statuses` in turn (then 200) and records each request."""
+
+    def __init__(self, statuses=(), delay: float = 0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        n = len(self.requests)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(self.statuses.pop(0) if self.statuses else 200, json={"n": n})
+
+
+def _client(inner: Upstream) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=upstream.ResilientTransport(httpx.MockTransport(inner)))
+
+
+def test_gets_are_retried_on_5xx():
+    inner = Upstream(statuses=[503, 502])
+
+    async def scenario():
+        async with _client(inner) as c:
+            return await c.get(URL)
+
+    assert asyncio.run(scenario()).status_code == 200
+    assert len(inner.requests) == 3
+
+
+@pytest.mark.parametrize("method", ["POST", "PATCH", "DELETE"])
+def test_non_gets_are_never_retried(method):
+    inner = Upstream(statuses=[503])
+
+    async def scenario():
+        async with _client(inner) as c:
+            return await c.request(method, URL, json={})
+
+    assert asyncio.run(scenario()).status_code == 503
+    assert len(inner.requests) == 1
+
+
+def test_breaker_opens_after_threshold_then_half_opens_after_cooldown():
+    inner = Upstream(statuses=[503] * 3)
+    breaker = upstream.breaker_for("db")
+
+    async def scenario():
+        async with _client(inner) as c:
+            await c.post(URL, json={})
+            await c.post(URL, json={})
+            assert breaker.state == "closed"
+            await c.post(URL, json={})
+            assert breaker.state == "open" and breaker.opens == 1
+
+            # While open, calls are shed without reaching the upstream.
+            with pytest.raises(upstream.UpstreamUnavailable) as e:
+                await c.get(URL)
+            assert e.value.retry_after > 0
+            assert len(inner.requests) == 3
+
+            await asyncio.sleep(settings.circuit_open_seconds)
+            assert breaker.state == "half_open"
+            # The probe succeeds and closes the circuit.
+            assert (await c.get(URL)).status_code == 200
+            assert breaker.state == "closed" and breaker.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_failed_half_open_probe_reopens():
+    inner = Upstream(statuses=[503] * 4)
+    breaker = upstream.breaker_for("db")
+
+    async def scenario():
+        async with _client(inner) as c:
+            for _ in range(3):
+                await c.post(URL, json={})
+            await asyncio.sleep(settings.circuit_open_seconds)
+            assert (await c.post(URL, json={})).status_code == 503
+            assert breaker.state == "open"
+
+    asyncio.run(scenario())
+
+
+def test_identical_gets_are_coalesced():
+    inner = Upstream(delay=0.05)
+
+    async def scenario():
+        async with _client(inner) as c:
+            headers = {"authorization": "Bearer a"}
+            return await asyncio.gather(*(c.get(URL, headers=headers) for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert len(inner.requests) == 1
+    assert {r.json()["n"] for r in responses} == {1}
+
+
+def test_gets_with_different_auth_are_not_coalesced():
+    inner = Upstream(delay=0.05)
+
+    async def scenario():
+        async with _client(inner) as c:
+            return await asyncio.gather(
+                c.get(URL, headers={"authorization": "Bearer user-a"}),
+                c.get(URL, headers={"authorization": "Bearer user-b"}),
+                c.get(URL, headers={"apikey": "other-key"}),
+            )
+
+    responses = asyncio.run(scenario())
+    assert len(inner.requests) == 3
+    assert sorted(r.headers.get("authorization", "") for r in inner.requests) == ["", "Bearer user-a", "Bearer user-b"]
+    assert len({r.json()["n"] for r in responses}) == 3
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+
+from app.core import users
+from app.core.config import settings
+
+EMAIL = "late@example.com"
+
+
+def _gotrue(all_users: list[dict], honours_filter: bool):
+    def handler(request: httpx.Request) -> httpx.Response:
+        q = request.url.params
+        rows = [u for u in all_users if u["email"] == q["email"]] if honours_filter else all_users
+        page, per_page = int(q["page"]), int(q["per_page"])
+        return httpx.Response(200, json={"users": rows[(page - 1) * per_page : page * per_page]})
+
+    return handler
+
+
+def _setup(monkeypatch, handler, max_pages=20):
+    monkeypatch.setattr(settings, "supabase_url", "http://gotrue.test")
+    monkeypatch.setattr(settings, "user_lookup_source", "auth_api")
+    monkeypatch.setattr(settings, "user_lookup_max_pages", max_pages)
+    monkeypatch.setattr(users, "_AUTH_PAGE_SIZE", 10)
+    monkeypatch.setattr(users, "get_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    users._email_cache.clear()
+
+
+def _others(n: int) -> list[dict]:
+    return [{"id": f"u{i}", "email": f"user{i}@example.com"} for i in range(n)]
+
+
+def test_unfiltered_listing_is_paged_until_the_user_is_found(monkeypatch):
+    _setup(monkeypatch, _gotrue(_others(25) + [{"id": "late", "email": EMAIL}], honours_filter=False))
+    assert asyncio.run(users.get_user_id_by_email(EMAIL)) == "late"
+
+
+def test_incomplete_search_is_not_cached_as_unknown(monkeypatch):
+    _setup(monkeypatch, _gotrue(_others(25) + [{"id": "late", "email": EMAIL}], honours_filter=False), max_pages=2)
+    assert asyncio.run(users.get_user_id_by_email(EMAIL)) is None
+    assert users._email_cache.get(EMAIL) is None
+
+
+def test_complete_misses_are_cached(monkeypatch):
+    for honours_filter in (True, False):
+        _setup(monkeypatch, _gotrue(_others(25), honours_filter=honours_filter))
+        assert asyncio.run(users.get_user_id_by_email(EMAIL)) is None
+        assert users._email_cache.get(EMAIL) == users._NOT_FOUND
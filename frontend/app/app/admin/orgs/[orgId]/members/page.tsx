@@ -5,7 +5,7 @@ import { useParams } from 'next/navigation'
 import toast from 'react-hot-toast'
 
 import { getSupabase } from '@/lib/supabase'
-import { apiFetch } from '@/lib/api'
+import { apiFetch, apiFetchAll } from '@/lib/api'
 import type { MeResponse, OrgMember } from '@/lib/types'
 import { Card } from '@/components/ui/Card'
 import { Button } from '@/components/ui/Button'
@@ -35,7 +35,7 @@ export default function AdminOrgMembersPage() {
       const meRes = await apiFetch<MeResponse>('/me', token)
       setMe(meRes)
       if (!meRes.is_system_admin) return
-      const res = await apiFetch<OrgMember[]>(`/admin/orgs/${orgId}/members`, token)
+      const res = await apiFetchAll<OrgMember>(`/admin/orgs/${orgId}/members`, token)
       setMembers(res)
     } catch (e: any) {
       toast.error(e?.message ?? 'Failed to load members')
@@ -35,13 +35,11 @@ export default function AdminOrgOverviewPage() {
         if (!alive) return
         setMe(meRes)
         if (!meRes.is_system_admin) return
-        const orgs = await apiFetch<Org[]>('/admin/orgs', token)
-        const found = orgs.find((o) => o.id === orgId) ?? null
+        const found = await apiFetch<Org>(`/admin/orgs/${orgId}`, token)
+        if (!alive) return
         setOrg(found)
-        if (found) {
-          setName(found.name)
-          setStatus(found.status)
-        }
+        setName(found.name)
+        setStatus(found.status)
       } catch (e: any) {
         toast.error(e?.message ?? 'Failed to load org')
       }
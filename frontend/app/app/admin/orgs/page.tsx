@@ -4,7 +4,7 @@ import { useEffect, useMemo, useState } from 'react'
 import toast from 'react-hot-toast'
 
 import { getSupabase } from '@/lib/supabase'
-import { apiFetch } from '@/lib/api'
+import { apiFetch, apiFetchAll } from '@/lib/api'
 import type { MeResponse, Org } from '@/lib/types'
 import { Card } from '@/components/ui/Card'
 import { Button } from '@/components/ui/Button'
@@ -34,7 +34,7 @@ export default function AdminOrgsPage() {
       const meRes = await apiFetch<MeResponse>('/me', token)
       setMe(meRes)
       if (!meRes.is_system_admin) return
-      const orgRes = await apiFetch<Org[]>('/admin/orgs', token)
+      const orgRes = await apiFetchAll<Org>('/admin/orgs', token)
       setOrgs(orgRes)
     } catch (e: any) {
       toast.error(e?.message ?? 'Failed to load orgs')
@@ -1,6 +1,6 @@
 import { env } from './env'
 
-export async function apiFetch<T>(path: string, token: string, init?: RequestInit): Promise<T> {
+async function request(path: string, token: string, init?: RequestInit): Promise<Response> {
   const base = env('NEXT_PUBLIC_API_BASE_URL')
   if (!base) throw new Error('Missing env var: NEXT_PUBLIC_API_BASE_URL')
   const res = await fetch(`${base}${path}`, {
@@ -20,5 +20,23 @@ export async function apiFetch<T>(path: string, token: string, init?: RequestIni
     } catch {}
     throw new Error(msg)
   }
+  return res
+}
+
+export async function apiFetch<T>(path: string, token: string, init?: RequestInit): Promise<T> {
+  const res = await request(path, token, init)
   return (await res.json()) as T
 }
+
+// Every page of a keyset-paginated list: follows X-Next-Cursor until the API stops sending it.
+export async function apiFetchAll<T>(path: string, token: string): Promise<T[]> {
+  const rows: T[] = []
+  let cursor: string | null = null
+  do {
+    const sep = path.includes('?') ? '&' : '?'
+    const res = await request(cursor ? `${path}${sep}cursor=${encodeURIComponent(cursor)}` : path, token)
+    rows.push(...((await res.json()) as T[]))
+    cursor = res.headers.get('X-Next-Cursor')
+  } while (cursor)
+  return rows
+}
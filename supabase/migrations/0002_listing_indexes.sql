@@ -0,0 +1,27 @@
+-- 0002_listing_indexes.sql
+-- Indexes backing keyset (created_at, id) pagination and the filters on the admin/org list endpoints.
+
+begin;
+
+create extension if not exists pg_trgm;
+
+-- GET /admin/orgs: order by created_at desc, id desc; optional status filter and name prefix.
+create index if not exists organizations_created_at_id_idx
+  on public.organizations (created_at desc, id desc);
+
+create index if not exists organizations_status_created_at_id_idx
+  on public.organizations (status, created_at desc, id desc);
+
+-- Case-insensitive name prefix (ILIKE 'abc%') cannot use a btree index; trigram GIN can.
+create index if not exists organizations_name_trgm_idx
+  on public.organizations using gin (name gin_trgm_ops);
+
+-- GET /admin/orgs/{org_id}/members and GET /org/members: one org, order by created_at, id;
+-- optional role filter.
+create index if not exists org_members_org_created_at_id_idx
+  on public.org_members (org_id, created_at, id);
+
+create index if not exists org_members_org_role_created_at_id_idx
+  on public.org_members (org_id, role, created_at, id);
+
+commit;
@@ -0,0 +1,48 @@
+-- 0003_auth_user_lookup.sql
+-- Email -> user id lookup table kept in sync with auth.users, so the API can resolve member emails
+-- with an indexed PostgREST query instead of the Auth admin API (USER_LOOKUP_SOURCE=table).
+
+begin;
+
+create table if not exists public.auth_user_lookup (
+  user_id uuid primary key references auth.users(id) on delete cascade,
+  email text not null
+);
+
+-- Emails are stored lowercased, so a plain btree serves lower(email) point and in.(...) lookups.
+create index if not exists auth_user_lookup_email_idx
+  on public.auth_user_lookup (email);
+
+-- Service role only: RLS on with no policies denies anon/authenticated.
+alter table public.auth_user_lookup enable row level security;
+revoke all on public.auth_user_lookup from anon, authenticated;
+
+create or replace function public.sync_auth_user_lookup()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if new.email is null then
+    delete from public.auth_user_lookup where user_id = new.id;
+  else
+    insert into public.auth_user_lookup (user_id, email)
+    values (new.id, lower(new.email))
+    on conflict (user_id) do update set email = excluded.email;
+  end if;
+  return new;
+end;
+$$;
+
+drop trigger if exists on_auth_user_email_sync on auth.users;
+create trigger on_auth_user_email_sync
+after insert or update of email on auth.users
+for each row execute function public.sync_auth_user_lookup();
+
+-- Backfill existing users.
+insert into public.auth_user_lookup (user_id, email)
+select id, lower(email) from auth.users where email is not null
+on conflict (user_id) do update set email = excluded.email;
+
+commit;
@@ -0,0 +1,35 @@
+-- 0004_set_org_modules.sql
+-- set_org_modules: apply module flag updates to many orgs and return the merged catalog + flags
+-- for those orgs in one call (used by the API when MODULE_FLAGS_USE_RPC=true).
+
+begin;
+
+create or replace function public.set_org_modules(_org_ids uuid[], _updates jsonb)
+returns table (org_id uuid, key text, name text, is_enabled boolean)
+language plpgsql
+security definer
+set search_path = public
+as $$
+#variable_conflict use_column
+begin
+  -- _updates: {"module_key": is_enabled, ...}; core stays locked ON.
+  insert into public.org_modules (org_id, module_key, is_enabled)
+  select o.id, u.key, u.value::boolean or u.key = 'core'
+  from unnest(_org_ids) as o(id)
+  cross join jsonb_each_text(_updates) as u(key, value)
+  on conflict (org_id, module_key) do update set is_enabled = excluded.is_enabled;
+
+  return query
+  select o.id, m.key, m.name, coalesce(om.is_enabled, false) or m.key = 'core'
+  from unnest(_org_ids) as o(id)
+  cross join public.modules m
+  left join public.org_modules om on om.org_id = o.id and om.module_key = m.key
+  order by o.id, m.key;
+end;
+$$;
+
+-- Admin-only write path: callable by the API's service role, not by browser clients.
+revoke execute on function public.set_org_modules(uuid[], jsonb) from public, anon, authenticated;
+grant execute on function public.set_org_modules(uuid[], jsonb) to service_role;
+
+commit;
@@ -0,0 +1,75 @@
+-- 0005_read_views.sql
+-- One-call read models for the hottest page-load endpoints (used when RPC_READ_VIEWS=true):
+--   get_me(user_id)                   -> GET /me
+--   get_org_modules_for_user(user_id) -> GET /org/modules (plus the memberships it was resolved from)
+-- Both take the user id from the API (which has already verified the JWT), so they are executable
+-- by the service role only.
+
+begin;
+
+create or replace function public.get_me(_user_id uuid)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  with mem as (
+    select m.org_id, m.role, m.created_at
+    from public.org_members m
+    where m.user_id = _user_id
+  )
+  select jsonb_build_object(
+    'user_id', _user_id,
+    'is_system_admin', exists(select 1 from public.system_admins sa where sa.user_id = _user_id),
+    'memberships', coalesce(
+      (select jsonb_agg(jsonb_build_object('org_id', mem.org_id, 'role', mem.role) order by mem.created_at) from mem),
+      '[]'::jsonb
+    ),
+    'default_org_id', (select mem.org_id from mem order by mem.created_at limit 1)
+  );
+$$;
+
+create or replace function public.get_org_modules_for_user(_user_id uuid)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  with mem as (
+    select m.org_id, m.role, m.created_at
+    from public.org_members m
+    where m.user_id = _user_id
+  ),
+  d as (
+    select mem.org_id from mem order by mem.created_at limit 1
+  )
+  select jsonb_build_object(
+    'org_id', (select d.org_id from d),
+    -- Returned so the API can warm its membership cache from the same call.
+    'memberships', coalesce(
+      (select jsonb_agg(jsonb_build_object('org_id', mem.org_id, 'role', mem.role) order by mem.created_at) from mem),
+      '[]'::jsonb
+    ),
+    'modules', coalesce(
+      (
+        select jsonb_agg(
+          jsonb_build_object('key', mo.key, 'name', mo.name, 'is_enabled', coalesce(om.is_enabled, false) or mo.key = 'core')
+          order by mo.key
+        )
+        from d
+        cross join public.modules mo
+        left join public.org_modules om on om.org_id = d.org_id and om.module_key = mo.key
+      ),
+      '[]'::jsonb
+    )
+  );
+$$;
+
+revoke execute on function public.get_me(uuid) from public, anon, authenticated;
+revoke execute on function public.get_org_modules_for_user(uuid) from public, anon, authenticated;
+grant execute on function public.get_me(uuid) to service_role;
+grant execute on function public.get_org_modules_for_user(uuid) to service_role;
+
+commit;
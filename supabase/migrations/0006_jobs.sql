@@ -0,0 +1,31 @@
+-- 0006_jobs.sql
+-- Background jobs run by the API's in-process workers (app/core/jobs.py).
+
+begin;
+
+create table if not exists public.jobs (
+  id uuid primary key default gen_random_uuid(),
+  kind text not null,
+  payload jsonb not null default '{}'::jsonb,
+  status text not null default 'queued' check (status in ('queued', 'running', 'succeeded', 'failed')),
+  progress integer not null default 0,
+  total integer,
+  attempts integer not null default 0,
+  result jsonb,
+  error text,
+  created_by uuid,
+  created_at timestamptz not null default now(),
+  started_at timestamptz,
+  finished_at timestamptz
+);
+
+-- Startup recovery scans queued jobs oldest first.
+create index if not exists jobs_queued_created_at_idx
+  on public.jobs (created_at)
+  where status = 'queued';
+
+-- Service role only: RLS on with no policies denies anon/authenticated.
+alter table public.jobs enable row level security;
+revoke all on public.jobs from anon, authenticated;
+
+commit;
@@ -0,0 +1,13 @@
+-- 0007_org_members_user_index.sql
+-- A user's memberships, oldest first: the default-org fallback (org_members where user_id = ?
+-- order by created_at), get_me() and get_org_modules_for_user(). The (org_id, user_id) unique
+-- index leads with org_id, so without this every lookup by user scanned and sorted.
+-- X-Org-Id validation is a point lookup on (org_id, user_id), served by that unique index.
+
+begin;
+
+create index if not exists org_members_user_created_at_idx
+  on public.org_members (user_id, created_at)
+  include (org_id, role);
+
+commit;
@@ -0,0 +1,94 @@
+-- 0008_rls_initplans.sql
+-- RLS policies that check admin/membership once per statement instead of once per row.
+--
+-- The 0001 policies call is_system_admin() and is_org_member(org_id) in USING, and SECURITY DEFINER
+-- functions are never inlined, so a query over N rows ran N admin and N membership subqueries.
+-- Wrapped in a scalar subquery, `(select public.is_system_admin())` becomes an InitPlan evaluated
+-- once per statement; `org_id in (select public.user_org_ids())` reads the caller's org ids once and
+-- hashes them. Policies are scoped `to authenticated` (anon has no auth.uid(), so it never matched).
+-- Compare before/after with `python -m bench.rls` (backend/).
+
+begin;
+
+-- Orgs the current user belongs to. SECURITY DEFINER: reads org_members without recursing into its RLS.
+create or replace function public.user_org_ids()
+returns setof uuid
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  select m.org_id
+  from public.org_members m
+  where m.user_id = (select auth.uid());
+$$;
+
+-- user_org_ids() and is_org_member(): user_id first, org_id for index-only scans.
+-- (system_admins.user_id is its primary key, so is_system_admin() is already a point lookup.)
+create index if not exists org_members_user_org_idx
+  on public.org_members (user_id, org_id);
+
+-- System admin: full access
+drop policy if exists organizations_system_admin_all on public.organizations;
+create policy organizations_system_admin_all
+on public.organizations
+for all
+to authenticated
+using ((select public.is_system_admin()))
+with check ((select public.is_system_admin()));
+
+drop policy if exists org_members_system_admin_all on public.org_members;
+create policy org_members_system_admin_all
+on public.org_members
+for all
+to authenticated
+using ((select public.is_system_admin()))
+with check ((select public.is_system_admin()));
+
+drop policy if exists modules_system_admin_all on public.modules;
+create policy modules_system_admin_all
+on public.modules
+for all
+to authenticated
+using ((select public.is_system_admin()))
+with check ((select public.is_system_admin()));
+
+drop policy if exists org_modules_system_admin_all on public.org_modules;
+create policy org_modules_system_admin_all
+on public.org_modules
+for all
+to authenticated
+using ((select public.is_system_admin()))
+with check ((select public.is_system_admin()));
+
+drop policy if exists system_admins_system_admin_all on public.system_admins;
+create policy system_admins_system_admin_all
+on public.system_admins
+for all
+to authenticated
+using ((select public.is_system_admin()))
+with check ((select public.is_system_admin()));
+
+-- Normal users: SELECT only where member.
+drop policy if exists organizations_member_select on public.organizations;
+create policy organizations_member_select
+on public.organizations
+for select
+to authenticated
+using (id in (select public.user_org_ids()));
+
+drop policy if exists org_members_member_select on public.org_members;
+create policy org_members_member_select
+on public.org_members
+for select
+to authenticated
+using (org_id in (select public.user_org_ids()));
+
+drop policy if exists org_modules_member_select on public.org_modules;
+create policy org_modules_member_select
+on public.org_modules
+for select
+to authenticated
+using (org_id in (select public.user_org_ids()));
+
+commit;
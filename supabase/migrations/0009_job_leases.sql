@@ -0,0 +1,19 @@
+-- 0009_job_leases.sql
+-- Leases for background jobs (app/core/jobs.py). A running job's worker bumps heartbeat_at
+-- every JOB_LEASE_SECONDS / 3. Every process's poller puts jobs whose heartbeat is older than
+-- the lease back in the queue (or fails them once JOB_MAX_ATTEMPTS is used up), so a crashed
+-- or restarted worker no longer leaves them `running` forever.
+
+begin;
+
+alter table public.jobs add column if not exists heartbeat_at timestamptz;
+
+-- Jobs already running under 0006 have no heartbeat; their start time stands in for it.
+update public.jobs set heartbeat_at = started_at where status = 'running' and heartbeat_at is null;
+
+-- The poller's stale-lease scan.
+create index if not exists jobs_running_heartbeat_at_idx
+  on public.jobs (heartbeat_at)
+  where status = 'running';
+
+commit;
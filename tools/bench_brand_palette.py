@@ -0,0 +1,107 @@
+"""Compare the NumPy and PIL palette paths of extract_brand_palette.py.
+
+    python tools/bench_brand_palette.py                      # repo logos + 100 synthetic 1024px logos
+    python tools/bench_brand_palette.py --images path/to/logos --synthetic 0 --repeat 3
+
+For every image, both paths run end to end (palette + tokens) `--repeat` times. The script reports
+per-image time for each path, the speedup, and how close the chosen tokens are (exact matches and
+the mean RGB distance between the tokens the two paths pick). pick_tokens is also timed alone on
+a logo-sized palette and on a large CSS-sized one.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import extract_brand_palette as ebp  # noqa: E402
+
+if ebp.np is None:
+    sys.exit("numpy is not installed: pip install numpy")
+
+
+def synthetic_logos(folder: Path, n: int, size: int = 1024, seed: int = 7) -> list[Path]:
+    """Flat-color shapes on a light background, softened so edges carry blended colors like real logos."""
+    rnd = random.Random(seed)
+    paths = []
+    for i in range(n):
+        bg = tuple(rnd.randint(235, 255) for _ in range(3))
+        img = Image.new("RGB", (size, size), bg)
+        draw = ImageDraw.Draw(img)
+        for _ in range(rnd.randint(2, 5)):
+            color = tuple(rnd.randint(0, 200) for _ in range(3))
+            x0, y0 = rnd.randint(0, size // 2), rnd.randint(0, size // 2)
+            box = (x0, y0, x0 + rnd.randint(size // 8, size // 2), y0 + rnd.randint(size // 8, size // 2))
+            (draw.ellipse if rnd.random() < 0.5 else draw.rectangle)(box, fill=color)
+        path = folder / f"logo_{i:03d}.png"
+        img.filter(ImageFilter.GaussianBlur(1.5)).save(path)
+        paths.append(path)
+    return paths
+
+
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000, result
+
+
+def token_distance(a: dict[str, str], b: dict[str, str]) -> float:
+    dist = []
+    for k in a:
+        ra, rb = ebp.rgb_tuple(a[k]), ebp.rgb_tuple(b[k])
+        dist.append(sum((x - y) ** 2 for x, y in zip(ra, rb)) ** 0.5)
+    return statistics.mean(dist)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--images", type=Path, help="folder of logos (png/jpg/webp) to add")
+    ap.add_argument("--synthetic", type=int, default=100, help="synthetic 1024px logos to generate")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per image (best is kept)")
+    args = ap.parse_args()
+
+    repo_root = Path(__file__).resolve().parent.parent
+    with tempfile.TemporaryDirectory() as tmp:
+        images = [p for p in ebp.find_sources(repo_root) if p.suffix.lower() == ".png"]
+        if args.images:
+            images += sorted(p for p in args.images.iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"))
+        images += synthetic_logos(Path(tmp), args.synthetic)
+
+        pil_ms, np_ms, exact, distances = [], [], 0, []
+        for path in images:
+            t_pil, tok_pil = timed(lambda: ebp.pick_tokens_py(ebp.image_palette_pil(path)), args.repeat)
+            t_np, tok_np = timed(lambda: ebp.pick_tokens(ebp.image_palette(path)), args.repeat)
+            pil_ms.append(t_pil)
+            np_ms.append(t_np)
+            exact += tok_pil == tok_np
+            distances.append(token_distance(tok_pil, tok_np))
+
+    print(f"images: {len(images)} (best of {args.repeat})")
+    print(f"{'path':<8}{'mean ms':>10}{'p50 ms':>10}{'total s':>10}")
+    for name, ms in (("pil", pil_ms), ("numpy", np_ms)):
+        print(f"{name:<8}{statistics.mean(ms):>10.2f}{statistics.median(ms):>10.2f}{sum(ms) / 1000:>10.2f}")
+    print(f"speedup: {sum(pil_ms) / sum(np_ms):.2f}x")
+    print(f"tokens identical: {exact}/{len(images)}; mean token RGB distance: {statistics.mean(distances):.1f}")
+
+    rnd = random.Random(1)
+    for n in (64, 5000):
+        counts = Counter({ebp.hex6(*(rnd.randint(0, 255) for _ in range(3))): rnd.randint(1, 500) for _ in range(n)})
+        t_py, a = timed(lambda: ebp.pick_tokens_py(counts), 20)
+        t_np, b = timed(lambda: ebp.pick_tokens(counts), 20)
+        same = "same" if a == b else "DIFFERENT"
+        print(f"pick_tokens {len(counts):>5} colors: py {t_py:.3f}ms  numpy {t_np:.3f}ms  ({t_py / t_np:.1f}x, {same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,45 @@
+import argparse
+import hashlib
 import json
 import os
 import re
+import sys
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
+from fnmatch import fnmatch
 from pathlib import Path
 from typing import Iterable, Optional
 
 from PIL import Image
 
+try:  # optional: pip install numpy (vectorized palette extraction; falls back to the PIL path)
+    import numpy as np
+except ImportError:
+    np = None
+
 
 HEX_RE = re.compile(r"#[0-9a-fA-F]{3,8}\b")
 RGB_RE = re.compile(
     r"rgb(a)?\(\s*(?P<r>\d{1,3})\s*,\s*(?P<g>\d{1,3})\s*,\s*(?P<b>\d{1,3})(?:\s*,\s*(?P<a>[\d.]+))?\s*\)"
 )
+# Both in one pass; a hex match never contains "rgb(" and an rgb() match never contains "#", so this
+# finds exactly the matches of the two patterns run separately.
+COLOR_RE = re.compile(f"(?P<hex>{HEX_RE.pattern})|{RGB_RE.pattern}")
+# Text sources are read CHUNK_CHARS at a time; the last MATCH_OVERLAP characters of each window are
+# rescanned with the next one, so any match up to that length survives a chunk boundary.
+CHUNK_CHARS = 1 << 20
+MATCH_OVERLAP = 256
+# File and directory names (globs) the source walk never enters: dependencies, build output, dotfiles.
+IGNORE_GLOBS = ("node_modules", "dist", "build", "out", "coverage", "__pycache__", ".*", "*.min.css", "*.map")
+# NumPy palette path: histogram bits per channel (32768 bins, fine enough to keep brand shades apart)
+# and the channel range below which a median-cut box is treated as a single color.
+HIST_BITS = 5
+MIN_SPLIT_SPAN = 16
+TEXT_SUFFIXES = (".html", ".css", ".svg")
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+ASSET_SUFFIXES = TEXT_SUFFIXES + IMAGE_SUFFIXES
 
 
 def clamp8(x: int) -> int:
@@ -36,15 +63,43 @@ def expand_hex(color: str) -> Optional[str]:
     return None
 
 
+def _collect_colors(text: str, hexes: list[str], rgbs: list[str], limit: Optional[int] = None) -> None:
+    # Matches starting before `limit` (all if None); the rest are picked up by the next window.
+    for m in COLOR_RE.finditer(text):
+        if limit is not None and m.start() >= limit:
+            break
+        if m.group("hex"):
+            h = expand_hex(m.group("hex"))
+            if h:
+                hexes.append(h)
+        else:
+            rgbs.append(hex6(int(m.group("r")), int(m.group("g")), int(m.group("b"))))
+
+
 def parse_text_colors(text: str) -> list[str]:
-    colors: list[str] = []
-    for m in HEX_RE.finditer(text):
-        h = expand_hex(m.group(0))
-        if h:
-            colors.append(h)
-    for m in RGB_RE.finditer(text):
-        colors.append(hex6(int(m.group("r")), int(m.group("g")), int(m.group("b"))))
-    return colors
+    # Hex colors first, then rgb()/rgba(), each in document order.
+    hexes: list[str] = []
+    rgbs: list[str] = []
+    _collect_colors(text, hexes, rgbs)
+    return hexes + rgbs
+
+
+def scan_file_colors(path: Path, chunk_chars: int = CHUNK_CHARS) -> list[str]:
+    """parse_text_colors over a file, streamed in overlapping windows so memory stays bounded."""
+    hexes: list[str] = []
+    rgbs: list[str] = []
+    carry = ""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        while True:
+            chunk = f.read(chunk_chars)
+            buf = carry + chunk
+            if not chunk:
+                _collect_colors(buf, hexes, rgbs)
+                break
+            limit = max(0, len(buf) - MATCH_OVERLAP)
+            _collect_colors(buf, hexes, rgbs, limit)
+            carry = buf[limit:]
+    return hexes + rgbs
 
 
 def srgb_to_luma(r: int, g: int, b: int) -> float:
@@ -67,7 +122,7 @@ def is_near_black(hex_color: str) -> bool:
     return r <= 8 and g <= 8 and b <= 8
 
 
-def image_palette(path: Path, colors: int = 64, sample: int = 256) -> Counter[str]:
+def image_palette_pil(path: Path, colors: int = 64, sample: int = 256) -> Counter[str]:
     img = Image.open(path).convert("RGBA")
     img.thumbnail((sample, sample))
     # Quantize to reduce noise; ignore alpha by converting to RGB.
@@ -81,7 +136,90 @@ def image_palette(path: Path, colors: int = 64, sample: int = 256) -> Counter[st
     return out
 
 
-def pick_tokens(counts: Counter[str]) -> dict[str, str]:
+def image_pixels(path: Path, sample: int = 256) -> "np.ndarray":
+    """Opaque pixels of an image as an (n, 3) uint8 array, subsampled to about sample x sample.
+
+    Strided subsampling instead of a resampling thumbnail: it is several times cheaper on large
+    logos and does not invent blended edge colors. Fully transparent pixels are dropped.
+    """
+    img = Image.open(path)
+    img.draft("RGB", (sample, sample))  # JPEG: decode at reduced scale; no-op for other formats
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    arr = np.asarray(img)
+    step = max(1, -(-max(arr.shape[:2]) // sample))
+    arr = arr[::step, ::step]
+    if arr.shape[-1] == 4:
+        return arr[arr[..., 3] > 0][:, :3]
+    return arr.reshape(-1, 3)
+
+
+def color_histogram(pixels: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """Occupied color bins as (n, 3) mean colors and pixel counts.
+
+    Pixels are packed into HIST_BITS-per-channel ints and counted with one bincount; each bin is
+    represented by the mean of the pixels that fell into it, not by its corner.
+    """
+    shift = 8 - HIST_BITS
+    q = (pixels >> shift).astype(np.int64)
+    key = (q[:, 0] << (2 * HIST_BITS)) | (q[:, 1] << HIST_BITS) | q[:, 2]
+    size = 1 << (3 * HIST_BITS)
+    counts = np.bincount(key, minlength=size)
+    occupied = np.flatnonzero(counts)
+    sums = np.stack([np.bincount(key, weights=pixels[:, c], minlength=size)[occupied] for c in range(3)], axis=1)
+    return sums / counts[occupied, None], counts[occupied]
+
+
+def _box(idx: "np.ndarray", rgb: "np.ndarray", weight: "np.ndarray") -> tuple[float, int, "np.ndarray"]:
+    # (split priority, channel to split on, members): widest channel range times pixel count.
+    span = rgb[idx].max(axis=0) - rgb[idx].min(axis=0)
+    ch = int(span.argmax())
+    if len(idx) < 2 or span[ch] < MIN_SPLIT_SPAN:
+        return -1.0, ch, idx
+    return float(span[ch]) * float(weight[idx].sum()), ch, idx
+
+
+def median_cut(rgb: "np.ndarray", weight: "np.ndarray", colors: int) -> tuple["np.ndarray", "np.ndarray"]:
+    """Weighted median cut of color bins into at most `colors` boxes.
+
+    Returns each box's pixel-weighted mean color (rounded, (k, 3)) and its pixel count.
+    Only boxes wider than MIN_SPLIT_SPAN are split, so flat logo colors stay one entry.
+    """
+    boxes = [_box(np.arange(len(rgb)), rgb, weight)]
+    while len(boxes) < colors:
+        i = max(range(len(boxes)), key=lambda j: boxes[j][0])
+        score, ch, idx = boxes[i]
+        if score <= 0:
+            break
+        order = idx[np.argsort(rgb[idx, ch], kind="stable")]
+        cum = np.cumsum(weight[order])
+        cut = min(max(int(np.searchsorted(cum, cum[-1] / 2)) + 1, 1), len(order) - 1)
+        boxes[i : i + 1] = [_box(order[:cut], rgb, weight), _box(order[cut:], rgb, weight)]
+
+    totals = np.array([weight[idx].sum() for _, _, idx in boxes])
+    means = np.array([(rgb[idx] * weight[idx, None]).sum(axis=0) / weight[idx].sum() for _, _, idx in boxes])
+    return np.rint(means).astype(np.int64), totals
+
+
+def image_palette(path: Path, colors: int = 64, sample: int = 256) -> Counter[str]:
+    if np is None:
+        return image_palette_pil(path, colors=colors, sample=sample)
+    pixels = image_pixels(path, sample=sample)
+    out: Counter[str] = Counter()
+    if not len(pixels):
+        return out
+    rgb, counts = color_histogram(pixels)
+    means, totals = median_cut(rgb, counts, colors)
+    for (r, g, b), n in zip(means.tolist(), totals.tolist()):
+        out[hex6(r, g, b)] += n
+    return out
+
+
+FALLBACK_RANKED = ["#25618D", "#1B5077", "#628BAB", "#EBF2F4", "#FEFEFE", "#16486D"]
+LUMA_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+
+def click_tokens(counts: Counter[str]) -> Optional[dict[str, str]]:
     # If the palette matches the known CLICK logo colors, map semantically.
     keys = {expand_hex(k) or k for k in counts.keys()}
     if {"#00A896", "#2C3E50"}.issubset(keys):
@@ -99,7 +237,65 @@ def pick_tokens(counts: Counter[str]) -> dict[str, str]:
             "brand-surface": surface,
             "brand-text": text,
         }
+    return None
+
+
+def pick_tokens(counts: Counter[str]) -> dict[str, str]:
+    known = click_tokens(counts)
+    if known:
+        return known
+    if np is None or not counts:
+        return pick_tokens_py(counts)
+
+    colors = list(counts.keys())
+    freq = np.fromiter(counts.values(), dtype=np.int64, count=len(colors))
+    # Parse every hex string once; luma and the near-white/black tests are array ops from here on.
+    packed = np.array([int((expand_hex(h) or h)[1:7], 16) for h in colors], dtype=np.int64)
+    rgb = (packed[:, None] >> np.array([16, 8, 0])) & 0xFF
+    luma = rgb @ np.array(LUMA_WEIGHTS)
+    white = (rgb >= 250).all(axis=1)
+    black = (rgb <= 8).all(axis=1)
 
+    # Remove pure white/black unless they are truly dominant.
+    total = int(freq.sum()) or 1
+    keep = ~(white | black)
+    if freq[keep].sum() / total < 0.6:
+        keep = np.ones(len(colors), dtype=bool)
+
+    # Sort by frequency (stable, like Counter.most_common).
+    kept = np.flatnonzero(keep)
+    ranked = [colors[i] for i in kept[np.argsort(-freq[kept], kind="stable")]]
+
+    # Choose lightest/darkest from the full set (including white-ish for bg/surface/text).
+    all_colors = colors
+    if not white.any():
+        # Allow white surface even if not present in logo sources.
+        all_colors = colors + ["#FFFFFF"]
+        luma = np.append(luma, sum(LUMA_WEIGHTS) * 255)
+        white = np.append(white, True)
+    by_luma = np.argsort(luma, kind="stable")
+    darkest = all_colors[by_luma[0]]
+    lightest = all_colors[by_luma[-1]]
+
+    primary = ranked[0]
+    secondary = ranked[1] if len(ranked) > 1 else primary
+    accent = ranked[2] if len(ranked) > 2 else secondary
+
+    # Background: prefer a very light non-white if available, else use lightest.
+    bg_candidates = np.flatnonzero((luma > 230) & ~white)
+    bg = all_colors[bg_candidates[-1]] if len(bg_candidates) else lightest
+
+    return {
+        "brand-primary": primary,
+        "brand-secondary": secondary,
+        "brand-accent": accent,
+        "brand-bg": bg,
+        "brand-surface": lightest,
+        "brand-text": darkest,
+    }
+
+
+def pick_tokens_py(counts: Counter[str]) -> dict[str, str]:
     # Remove pure white/black unless they are truly dominant.
     total = sum(counts.values()) or 1
     filtered = Counter(
@@ -115,7 +311,7 @@ def pick_tokens(counts: Counter[str]) -> dict[str, str]:
     # Sort by frequency.
     ranked = [c for c, _ in filtered.most_common()]
     if not ranked:
-        ranked = ["#25618D", "#1B5077", "#628BAB", "#EBF2F4", "#FEFEFE", "#16486D"]
+        ranked = FALLBACK_RANKED
 
     # Choose lightest/darkest from the full set (including white-ish for bg/surface/text).
     all_colors = list(counts.keys()) or ranked
@@ -153,7 +349,20 @@ class ExtractionResult:
     tokens: dict[str, str]
 
 
-def find_sources(repo_root: Path) -> list[Path]:
+def _ignored(name: str, ignore: Iterable[str]) -> bool:
+    return any(fnmatch(name, g) for g in ignore)
+
+
+def walk_files(root: Path, ignore: Iterable[str] = IGNORE_GLOBS) -> Iterable[Path]:
+    # Sorted, and pruned at ignored directories instead of filtering an rglob of everything below them.
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not _ignored(d, ignore))
+        for name in sorted(filenames):
+            if not _ignored(name, ignore):
+                yield Path(dirpath) / name
+
+
+def find_sources(repo_root: Path, ignore: Iterable[str] = IGNORE_GLOBS) -> list[Path]:
     candidates: list[Path] = []
     explicit = [
         repo_root / "mnt" / "data" / "logo.html",
@@ -169,9 +378,7 @@ def find_sources(repo_root: Path) -> list[Path]:
             root = base / folder
             if not root.exists():
                 continue
-            for p in root.rglob("*"):
-                if not p.is_file():
-                    continue
+            for p in walk_files(root, ignore):
                 n = p.name.lower()
                 if any(k in n for k in ("logo", "brand", "click", "icon")) and p.suffix.lower() in (
                     ".svg",
@@ -193,28 +400,39 @@ def find_sources(repo_root: Path) -> list[Path]:
     return out
 
 
-def extract(repo_root: Path) -> ExtractionResult:
-    sources = find_sources(repo_root)
+def analyze_file(p: Path) -> Counter[str]:
+    # Colors of one asset: declared colors for text sources, the quantized palette for images.
+    if p.suffix.lower() in TEXT_SUFFIXES:
+        return Counter(scan_file_colors(p))
+    return image_palette(p)
+
+
+def analyze_cached(p: Path, cache: Optional["PaletteCache"]) -> Counter[str]:
+    if cache is None:
+        return analyze_file(p)
+    k = cache.key(p)
+    counts = cache.get(k)
+    if counts is None:
+        counts = analyze_file(p)
+        cache.put(k, counts)
+    return counts
+
+
+def combine(analyses: list[tuple[Path, Optional[Counter[str]]]]) -> ExtractionResult:
+    """Tokens for one brand from its analyzed assets (None marks an asset that failed to parse)."""
     text_counts: Counter[str] = Counter()
     image_counts: Counter[str] = Counter()
     used_sources: list[str] = []
 
-    for p in sources:
-        suf = p.suffix.lower()
-        try:
-            if suf in (".html", ".css", ".svg"):
-                text = p.read_text(encoding="utf-8", errors="ignore")
-                colors = parse_text_colors(text)
-                if colors:
-                    text_counts.update(colors)
-                    used_sources.append(str(p.as_posix()))
-            elif suf == ".png":
-                pal = image_palette(p)
-                if pal:
-                    image_counts.update(pal)
-                    # only mark used if we end up relying on image sources
-        except Exception:
+    for p, colors in analyses:
+        if not colors:
             continue
+        if p.suffix.lower() in TEXT_SUFFIXES:
+            text_counts.update(colors)
+            used_sources.append(str(p.as_posix()))
+        else:
+            image_counts.update(colors)
+            # only mark used if we end up relying on image sources
 
     # Prefer explicit HTML/CSS/SVG colors if present (logo sources of truth),
     # otherwise fall back to image palette.
@@ -222,19 +440,26 @@ def extract(repo_root: Path) -> ExtractionResult:
         counts = text_counts
     else:
         counts = image_counts
-        for p in sources:
-            if p.suffix.lower() == ".png":
+        for p, _ in analyses:
+            if p.suffix.lower() in IMAGE_SUFFIXES:
                 used_sources.append(str(p.as_posix()))
 
     tokens = pick_tokens(counts)
     return ExtractionResult(sources=used_sources, counts=counts, tokens=tokens)
 
 
-def main() -> None:
-    repo_root = Path(os.getcwd()).resolve()
-    result = extract(repo_root)
+def extract(repo_root: Path, cache: Optional["PaletteCache"] = None, ignore: Iterable[str] = IGNORE_GLOBS) -> ExtractionResult:
+    analyses: list[tuple[Path, Optional[Counter[str]]]] = []
+    for p in find_sources(repo_root, ignore):
+        try:
+            analyses.append((p, analyze_cached(p, cache)))
+        except Exception:
+            analyses.append((p, None))
+    return combine(analyses)
+
 
-    out = {
+def to_json(result: ExtractionResult) -> dict:
+    return {
         "sources": result.sources,
         "tokens": {
             "--brand-primary": result.tokens["brand-primary"],
@@ -247,7 +472,213 @@ def main() -> None:
         "top_colors": [c for c, _ in result.counts.most_common(24)],
     }
 
+
+# --- Batch mode: one palette per org ---------------------------------------------------------------
+
+# Bump when analysis output changes; the NumPy and PIL paths quantize differently, so they don't share entries.
+CACHE_VERSION = f"2:{'numpy' if np is not None else 'pil'}:{HIST_BITS}:{MIN_SPLIT_SPAN}"
+CACHE_SAVE_EVERY = 200
+
+
+def org_assets_from_dir(root: Path, ignore: Iterable[str] = IGNORE_GLOBS) -> dict[str, list[Path]]:
+    """<root>/<org_id>/** (any depth) or <root>/<org_id>.<ext> for single-logo orgs."""
+    orgs: dict[str, list[Path]] = {}
+    for entry in sorted(root.iterdir()):
+        if entry.is_dir():
+            files = [p for p in walk_files(entry, ignore) if p.suffix.lower() in ASSET_SUFFIXES]
+            if files:
+                orgs[entry.name] = files
+        elif entry.suffix.lower() in ASSET_SUFFIXES and not _ignored(entry.name, ignore):
+            orgs.setdefault(entry.stem, []).append(entry)
+    return orgs
+
+
+def org_assets_from_manifest(manifest: Path) -> dict[str, list[Path]]:
+    """JSON object of org_id -> asset path or list of paths, relative to the manifest's folder."""
+    data = json.loads(manifest.read_text(encoding="utf-8"))
+    base = manifest.parent
+    return {str(org): [base / p for p in ([paths] if isinstance(paths, str) else paths)] for org, paths in data.items()}
+
+
+class PaletteCache:
+    """Per-asset color counts keyed by content hash, persisted as one JSON file.
+
+    A path -> (mtime_ns, size, key) index lets repeat runs skip reading and hashing unchanged files.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: dict[str, dict[str, int]] = {}
+        self.files: dict[str, list] = {}
+        self._dirty = 0
+        if path and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                data = {}
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("entries", {})
+                self.files = data.get("files", {})
+
+    def key(self, p: Path) -> str:
+        st = p.stat()
+        name = os.path.abspath(p)
+        known = self.files.get(name)
+        if known and known[0] == st.st_mtime_ns and known[1] == st.st_size and known[2] in self.entries:
+            return known[2]
+        # Text and image assets are analyzed differently, so the kind is part of the key.
+        kind = "text" if p.suffix.lower() in TEXT_SUFFIXES else "image"
+        h = hashlib.sha256()
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_CHARS), b""):
+                h.update(block)
+        k = f"{kind}:{h.hexdigest()}"
+        self.files[name] = [st.st_mtime_ns, st.st_size, k]
+        self._dirty += 1
+        return k
+
+    def get(self, key: str) -> Optional[Counter[str]]:
+        hit = self.entries.get(key)
+        return Counter(hit) if hit is not None else None
+
+    def put(self, key: str, counts: Counter[str]) -> None:
+        self.entries[key] = dict(counts)
+        self._dirty += 1
+        if self._dirty >= CACHE_SAVE_EVERY:
+            self.save()
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "entries": self.entries, "files": self.files}), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = 0
+
+
+def _analyze_timed(p: Path) -> tuple[Optional[Counter[str]], Optional[str], float]:
+    # Runs in a worker process; errors are returned, not raised, so one bad upload can't stop the batch.
+    start = time.perf_counter()
+    try:
+        counts, error = analyze_file(p), None
+    except Exception as e:
+        counts, error = None, f"{type(e).__name__}: {e}"
+    return counts, error, time.perf_counter() - start
+
+
+def run_batch(orgs: dict[str, list[Path]], cache: PaletteCache, workers: Optional[int], out) -> dict:
+    """Analyze every org's assets over a process pool and write one NDJSON line per org as it completes.
+
+    Assets are deduplicated by content hash, so a logo shared by many orgs (or unchanged since the
+    last run) is analyzed at most once.
+    """
+    start = time.perf_counter()
+    stats = {"orgs": len(orgs), "files": 0, "cached": 0, "analyzed": 0, "errors": 0}
+    done = 0
+
+    # Per org: asset -> cache key; per key: one representative path and the orgs waiting on it.
+    keys: dict[str, list[tuple[Path, Optional[str]]]] = {}
+    errors: dict[str, list[str]] = {org: [] for org in orgs}
+    pending: dict[str, Path] = {}
+    waiting: dict[str, set[str]] = {}
+    org_ms: dict[str, float] = {org: 0.0 for org in orgs}
+    cached_files: dict[str, int] = {org: 0 for org in orgs}
+    for org, paths in orgs.items():
+        keys[org] = []
+        for p in paths:
+            stats["files"] += 1
+            try:
+                k = cache.key(p)
+            except OSError as e:
+                errors[org].append(f"{p.as_posix()}: {type(e).__name__}: {e}")
+                keys[org].append((p, None))
+                continue
+            keys[org].append((p, k))
+            if k in cache.entries:
+                cached_files[org] += 1
+            else:
+                pending.setdefault(k, p)
+                waiting.setdefault(k, set()).add(org)
+
+    def emit(org: str) -> None:
+        nonlocal done
+        done += 1
+        result = combine([(p, cache.get(k) if k else None) for p, k in keys[org]])
+        # No colors at all: report null tokens rather than the default palette pick_tokens falls back to.
+        body = to_json(result) if result.counts else {"sources": [], "tokens": None, "top_colors": []}
+        line = {
+            "org_id": org,
+            **body,
+            "files": len(keys[org]),
+            "cached": cached_files[org],
+            "analyze_ms": round(org_ms[org], 1),
+            "errors": errors[org],
+            "progress": {"done": done, "total": len(orgs), "elapsed_s": round(time.perf_counter() - start, 2)},
+        }
+        stats["errors"] += len(errors[org])
+        out.write(json.dumps(line) + "\n")
+        out.flush()
+
+    remaining = {org: {k for _, k in keys[org] if k in pending} for org in orgs}
+    for org in orgs:
+        if not remaining[org]:
+            emit(org)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_analyze_timed, p): k for k, p in pending.items()}
+            for fut in as_completed(futures):
+                k = futures[fut]
+                counts, error, seconds = fut.result()
+                stats["analyzed"] += 1
+                if error is None:
+                    cache.put(k, counts)
+                for org in sorted(waiting[k]):
+                    org_ms[org] += seconds * 1000
+                    if error is not None:
+                        errors[org].extend(f"{p.as_posix()}: {error}" for p, pk in keys[org] if pk == k)
+                    remaining[org].discard(k)
+                    if not remaining[org]:
+                        emit(org)
+    cache.save()
+
+    stats["cached"] = sum(cached_files.values())
+    stats["elapsed_s"] = round(time.perf_counter() - start, 2)
+    stats["orgs_per_s"] = round(len(orgs) / stats["elapsed_s"], 1) if stats["elapsed_s"] else None
+    return stats
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Extract brand color tokens from logo assets.")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--batch", type=Path, help="folder of per-org assets: <dir>/<org_id>/... or <dir>/<org_id>.png")
+    src.add_argument("--manifest", type=Path, help="JSON object of org_id -> asset path(s)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--cache", type=Path, default=Path("tools/.brand_palette_cache.json"), help="content-hash cache file")
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--out", type=Path, help="write NDJSON here instead of stdout")
+    ap.add_argument("--ignore", action="append", default=[], help="extra file/directory glob to skip (repeatable)")
+    args = ap.parse_args()
+    ignore = IGNORE_GLOBS + tuple(args.ignore)
+    cache = PaletteCache(None if args.no_cache else args.cache)
+
+    if args.batch or args.manifest:
+        orgs = org_assets_from_dir(args.batch, ignore) if args.batch else org_assets_from_manifest(args.manifest)
+        out = args.out.open("w", encoding="utf-8") if args.out else sys.stdout
+        try:
+            stats = run_batch(orgs, cache, args.workers, out)
+        finally:
+            if args.out:
+                out.close()
+        print(json.dumps({"summary": stats}), file=sys.stderr)
+        return
+
+    repo_root = Path(os.getcwd()).resolve()
+    out = to_json(extract(repo_root, cache, ignore))
+
     Path("tools").mkdir(parents=True, exist_ok=True)
+    cache.save()
     Path("tools/brand_palette.json").write_text(json.dumps(out, indent=2), encoding="utf-8")
     print(json.dumps(out, indent=2))
 